@@ -1,13 +1,20 @@
+import time
+rerun_start = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-from utils.auth_utils import validate_login, register_user
-from utils.marketplace import marketplace_page
-from utils.price_prediction import price_prediction_page
-from utils.crop_recommendation import recommend_crops
+from utils import config
+from utils.instrumentation import profile, record, snapshot, start_metrics_server
+from utils.timing import record_rerun, timed_import, timing_report
+
+# Page modules (and pandas, sklearn, plotly behind them) are imported only
+# when their page renders, so login and Home reruns stay light.
 
 # Set page configuration
 st.set_page_config(page_title="AgriPredict", layout="wide")
 
+# /metrics endpoint for this process (no-op unless AGRI_METRICS_PORT is set)
+start_metrics_server()
+
 # Initialize session state
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
@@ -18,6 +25,7 @@ if "current_page" not in st.session_state:
 
 # Login/Signup Page
 if not st.session_state.authenticated:
+    auth_utils = timed_import("utils.auth_utils")
     st.title("🔐 Login / Signup")
 
     # Tabs for login and signup
@@ -29,7 +37,7 @@ if not st.session_state.authenticated:
         password = st.text_input("Password", type="password")
         role = st.selectbox("Role", ["farmer", "company"])
         if st.button("Login"):
-            if validate_login(username, password, role):
+            if auth_utils.validate_login(username, password, role):
                 # Update session state
                 st.session_state.authenticated = True
                 st.session_state.role = role
@@ -46,7 +54,7 @@ if not st.session_state.authenticated:
         role = st.selectbox("Role", ["farmer", "company"], key="signup_role")
 
         if st.button("Signup"):
-            message = register_user(username, password, role)
+            message = auth_utils.register_user(username, password, role)
             if "Account created" in message:
                 st.success(message)
             else:
@@ -137,24 +145,24 @@ else:
         4. Ensures accessibility through mobile and web platforms, making it convenient for farmers in remote areas.
         """)
 
+    # Page renders are profiled when AGRI_PROFILE is set
     elif st.session_state.current_page == "Price Prediction":
-        price_prediction_page()
+        with profile("price_prediction"):
+            timed_import("utils.price_prediction").price_prediction_page()
 
     elif st.session_state.current_page == "Crop Recommendation":
-        st.title("🌾 Crop Recommendation")
-
-        # Inputs
-        soil_type = st.selectbox("Select Soil Type", ["Loamy", "Sandy", "Clay"])
-        land_size = st.number_input("Enter Land Size (in acres)", min_value=1.0)
-        place = st.selectbox("Select Place", ["North Karnataka", "South Karnataka"])
-
-        if st.button("Get Recommendations"):
-            # Prepare input data
-            recommendations = recommend_crops(place, soil_type, land_size)
-
-            # Display recommendations
-            df = pd.DataFrame(recommendations)
-            st.table(df)
+        with profile("crop_recommendation"):
+            timed_import("utils.crop_page").crop_recommendation_page()
 
     elif st.session_state.current_page == "Marketplace":
-        marketplace_page()
+        with profile("marketplace"):
+            timed_import("utils.marketplace").marketplace_page()
+
+# Timing report (AGRI_SHOW_TIMINGS=1)
+page = st.session_state.current_page if st.session_state.authenticated else "Login"
+rerun_seconds = time.perf_counter() - rerun_start
+record_rerun(page, rerun_seconds)
+record(f"rerun.{page}", rerun_seconds)
+if config.SHOW_TIMINGS:
+    with st.sidebar.expander("⏱️ Timings"):
+        st.json({**timing_report(), **snapshot()})
@@ -0,0 +1,87 @@
+"""
+Login throughput at different password-hash costs.
+
+Usage:
+    python -m benchmarks.login_benchmark --costs 12 13 14 15 --seconds 3
+    python -m benchmarks.login_benchmark --algorithm pbkdf2_sha256 --costs 100000 300000 600000
+
+Each login is a user-store lookup plus a password verification, which is
+what validate_login does for an up-to-date hash. Runs one worker process per
+core requested so the per-core figure includes any memory-bandwidth contention
+(scrypt is memory-hard). Pass --peak-logins to get the largest cost that keeps
+peak traffic within the given core budget.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.passwords import hash_password, verify_password
+from utils.user_store import SqliteUserStore
+
+USERS = 100
+
+
+def _worker(db_file, seconds):
+    store = SqliteUserStore(db_file)
+    logins = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        user = store.get_user(f"user{logins % USERS}")
+        if not verify_password("correct horse", user["password"]):
+            raise RuntimeError("benchmark password did not verify")
+        logins += 1
+    return logins
+
+
+def run(algorithm, cost, processes, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "users.db")
+        store = SqliteUserStore(db_file)
+        # Every user gets the same password; salts still differ per user
+        stored = [hash_password("correct horse", algorithm, cost) for _ in range(USERS)]
+        store.import_users([(f"user{i}", stored[i], "farmer") for i in range(USERS)])
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(processes) as pool:
+            counts = list(pool.map(_worker, [db_file] * processes, [seconds] * processes))
+        elapsed = time.perf_counter() - start
+
+    total = sum(counts)
+    return {
+        "algorithm": algorithm,
+        "cost": cost,
+        "processes": processes,
+        "logins_per_sec": total / elapsed,
+        "logins_per_sec_per_core": total / elapsed / processes,
+        "ms_per_login": 1000 * elapsed * processes / total,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark logins/sec per core by hash cost.")
+    parser.add_argument("--algorithm", default="scrypt", choices=["scrypt", "pbkdf2_sha256"])
+    parser.add_argument("--costs", type=int, nargs="+", default=[12, 13, 14, 15])
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (cores) to use")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration per cost setting")
+    parser.add_argument("--peak-logins", type=float, help="peak logins/sec the deployment must sustain")
+    parser.add_argument("--cores", type=int, default=os.cpu_count(), help="cores available for logins")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'cost':>10} {'logins/s':>12} {'per core':>12} {'ms/login':>10}")
+    for cost in args.costs:
+        result = run(args.algorithm, cost, args.processes, args.seconds)
+        results.append(result)
+        print(f"{cost:>10} {result['logins_per_sec']:>12.1f} "
+              f"{result['logins_per_sec_per_core']:>12.1f} {result['ms_per_login']:>10.2f}")
+
+    if args.peak_logins:
+        capacity = [r for r in results if r["logins_per_sec_per_core"] * args.cores >= args.peak_logins]
+        if capacity:
+            best = max(capacity, key=lambda r: r["cost"])
+            print(f"\nLargest cost sustaining {args.peak_logins:.0f} logins/s on {args.cores} cores: "
+                  f"{best['cost']} (set AGRI_PASSWORD_HASH_COST={best['cost']})")
+        else:
+            print(f"\nNo tested cost sustains {args.peak_logins:.0f} logins/s on {args.cores} cores.")
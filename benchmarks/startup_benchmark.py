@@ -0,0 +1,107 @@
+"""
+Cold-start and rerun latency of the Streamlit app.
+
+Usage:
+    python -m benchmarks.startup_benchmark --reruns 20 --output startup.json
+
+Each import and each page is measured in a fresh interpreter, so the numbers
+are cold starts. Import times are the median of --repeat runs. Page numbers
+come from Streamlit's AppTest: "first" is the first script run (imports,
+model loads, cache fills), "rerun" covers the reruns after it. Run it on two
+commits to compare before and after a change.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+MODULES = [
+    "streamlit", "numpy", "pandas", "sklearn", "plotly.graph_objs",
+    "utils.auth_utils", "utils.crop_page", "utils.price_prediction", "utils.marketplace",
+]
+PAGES = ["Login", "Home", "Price Prediction", "Crop Recommendation", "Marketplace"]
+
+
+def import_seconds(module, repeat):
+    """
+    Median wall time of `import module` in a fresh interpreter, or None if it fails.
+    """
+    code = (f"import time; start = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - start)")
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def _page_timings(app_file, page, reruns):
+    import warnings
+    warnings.filterwarnings("ignore")
+    from streamlit import logger
+    from streamlit.testing.v1 import AppTest
+    logger.set_log_level("error")
+
+    at = AppTest.from_file(os.path.abspath(app_file), default_timeout=120)
+    if page != "Login":
+        at.session_state["authenticated"] = True
+        at.session_state["role"] = "farmer"
+        at.session_state["current_page"] = page
+
+    samples = []
+    for _ in range(reruns + 1):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].value}")
+    return samples
+
+
+def page_timings(app_file, page, reruns):
+    # A spawned worker per page, so each page starts with nothing imported
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        samples = pool.submit(_page_timings, app_file, page, reruns).result()
+    ordered = sorted(samples[1:])
+    return {
+        "first_ms": 1000 * samples[0],
+        "rerun_p50_ms": 1000 * statistics.median(ordered),
+        "rerun_p95_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cold imports and per-page rerun latency.")
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns per page after the first run")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per import")
+    parser.add_argument("--pages", nargs="+", default=PAGES, choices=PAGES)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"imports_ms": {}, "pages": {}}
+    print(f"{'import':<24} {'ms':>10}")
+    for module in MODULES:
+        seconds = import_seconds(module, args.repeat)
+        results["imports_ms"][module] = None if seconds is None else 1000 * seconds
+        print(f"{module:<24} {'n/a' if seconds is None else f'{1000 * seconds:.1f}':>10}")
+
+    print(f"\n{'page':<24} {'first ms':>10} {'rerun p50':>10} {'rerun p95':>10}")
+    for page in args.pages:
+        timings = page_timings(args.app, page, args.reruns)
+        results["pages"][page] = timings
+        print(f"{page:<24} {timings['first_ms']:>10.1f} {timings['rerun_p50_ms']:>10.1f} "
+              f"{timings['rerun_p95_ms']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
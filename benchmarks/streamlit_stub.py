@@ -0,0 +1,121 @@
+"""
+Minimal stand-in for the streamlit module so page functions run headless.
+
+install() puts a Stub in sys.modules["streamlit"]; import the page modules
+after that. Widgets return the value set in stub.values for their label, else
+their default (first option, min_value, ...). Buttons are pressed when their
+label is in stub.pressed. Everything that only renders is a no-op.
+cache_data / cache_resource memoize on their arguments like Streamlit does.
+"""
+import functools
+import sys
+import types
+
+
+class _Noop:
+    """
+    Context manager and catch-all for containers (columns, expanders, sidebar).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(_stub, name)
+
+
+class _SessionState(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def _cache(func=None, **options):
+    def decorate(func):
+        memo = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            if key not in memo:
+                memo[key] = func(*args, **kwargs)
+            return memo[key]
+
+        wrapper.clear = memo.clear
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+class Stub(types.ModuleType):
+    def __init__(self):
+        super().__init__("streamlit")
+        self.values = {}
+        self.pressed = set()
+        self.session_state = _SessionState()
+        self.sidebar = _Noop()
+        self.cache_data = _cache
+        self.cache_resource = _cache
+
+    def _value(self, label, default):
+        return self.values.get(label, default)
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        options = list(options)
+        return self._value(label, options[index] if options else None)
+
+    def radio(self, label, options, index=0, **kwargs):
+        return self.selectbox(label, options, index)
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return self._value(label, list(default or []))
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return self._value(label, value if value is not None else min_value)
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return self._value(label, value if value is not None else (min_value or 0.0))
+
+    def text_input(self, label, value="", **kwargs):
+        return self._value(label, value)
+
+    def date_input(self, label, value=None, **kwargs):
+        return self._value(label, value)
+
+    def button(self, label, **kwargs):
+        return label in self.pressed
+
+    def columns(self, spec, **kwargs):
+        return [_Noop() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def tabs(self, labels):
+        return [_Noop() for _ in labels]
+
+    def expander(self, *args, **kwargs):
+        return _Noop()
+
+    def rerun(self):
+        pass
+
+    def __getattr__(self, name):
+        # st.title, st.write, st.plotly_chart, st.dataframe, ... render nothing
+        return lambda *args, **kwargs: None
+
+
+_stub = Stub()
+
+
+def install():
+    """
+    Replace streamlit in sys.modules with the stub and return it.
+    """
+    sys.modules["streamlit"] = _stub
+    return _stub
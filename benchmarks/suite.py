@@ -0,0 +1,289 @@
+"""
+Benchmark suite for the app's hot paths on synthetic data.
+
+Usage:
+    python -m benchmarks.suite --sizes 1000 100000 --output bench.json
+    python -m benchmarks.suite --sizes 10000000 --scenarios forecast_prices --seconds 30
+    python -m benchmarks.suite --output bench.json --compare last_release.json
+
+Each scenario runs in a fresh interpreter whose working directory is a
+synthetic workdir (see benchmarks.synthetic_data), so the utils modules read
+the generated data/ files through their usual relative paths. Databases and
+caches are removed first, so "cold_ms" covers CSV migration, model loading
+and index builds. Page scenarios run with Streamlit replaced by
+benchmarks.streamlit_stub. Latencies are wall times per call; peak_rss_mb is
+the scenario process's peak resident set size.
+
+--compare exits with status 1 if any p50/p95 latency or peak RSS got worse
+than the baseline by more than --tolerance.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.synthetic_data import REPO_ROOT, prepare_workdir, reset_state
+
+DEFAULT_SIZES = [1_000, 100_000]
+COMPARED_METRICS = ["p50_ms", "p95_ms", "peak_rss_mb"]
+SAMPLE_USERS = 50
+BATCH_FARMS = 1_000
+
+
+def _sample_farms(rng, n):
+    from utils.crop_recommendation import REGION_MAPPING, SOIL_MAPPING
+
+    return list(zip(rng.choice(list(REGION_MAPPING), n),
+                    rng.choice(list(SOIL_MAPPING), n),
+                    np.round(rng.uniform(1, 50, n), 1).tolist()))
+
+
+def _recommend_crops(rng):
+    from utils.crop_recommendation import recommend_crops
+
+    farms = _sample_farms(rng, 1_000)
+    return lambda i: recommend_crops(*farms[i % len(farms)]), 1
+
+
+def _recommend_crops_batch(rng):
+    import pandas as pd
+    from utils.crop_recommendation import recommend_crops_batch
+
+    farms = pd.DataFrame(_sample_farms(rng, BATCH_FARMS), columns=["region", "soil_type", "land_size"])
+    return lambda i: recommend_crops_batch(farms), BATCH_FARMS
+
+
+def _forecast_prices(rng):
+    from utils.model_registry import get_price_model
+    from utils.price_forecast import forecast_prices, load_price_history
+
+    history = load_price_history()
+    n_pairs = len(history.groupby(["Crop", "City"]))
+    # Every pair in one call, as the forecast cache refresh does
+    return lambda i: forecast_prices(history, get_price_model(), horizon=5), n_pairs
+
+
+def _price_prediction_page(rng):
+    from benchmarks import streamlit_stub
+
+    st = streamlit_stub.install()
+    from utils.forecast_cache import forecast_cache
+    from utils.price_prediction import price_prediction_page
+
+    options = {}
+
+    def render(i):
+        if i:
+            # Move to another crop/city so reruns mix cache hits and misses
+            st.values["Select Crop"] = options["crops"][rng.integers(len(options["crops"]))]
+            st.values["Select City"] = options["cities"][rng.integers(len(options["cities"]))]
+        price_prediction_page()
+        if not options:
+            history = forecast_cache.history()
+            options["crops"] = list(history["Crop"].unique())
+            options["cities"] = list(history["City"].unique()[:200])
+
+    return render, 1
+
+
+def _price_comparison_page(rng):
+    from benchmarks import streamlit_stub
+
+    st = streamlit_stub.install()
+    st.values["Mode"] = "Compare"
+    from utils.forecast_cache import forecast_cache
+    from utils.price_prediction import price_prediction_page
+
+    crops = list(forecast_cache.history()["Crop"].unique())
+
+    def render(i):
+        # Every city of one crop per rerun, cycling through the crops
+        st.values["Crops"] = [crops[i % len(crops)]]
+        price_prediction_page()
+
+    return render, 1
+
+
+def _login_sample():
+    import pandas as pd
+
+    users = pd.read_csv("data/users.csv", nrows=SAMPLE_USERS)
+    return list(users.itertuples(index=False, name=None))
+
+
+def _validate_login(rng):
+    from utils.auth_utils import validate_login
+
+    users = _login_sample()
+    # Log everyone in once so plaintext rows are upgraded to hashes; the timed
+    # logins then verify hashes at the configured cost.
+    for username, password, role in users:
+        if not validate_login(username, password, role):
+            raise RuntimeError(f"synthetic user {username} failed to log in")
+    return lambda i: validate_login(*users[i % len(users)]), 1
+
+
+def _register_user(rng):
+    from utils.auth_utils import register_user
+
+    run = time.time_ns()
+    return lambda i: register_user(f"bench{run}_{i}", "correct horse", "farmer"), 1
+
+
+def _marketplace_page(rng):
+    from benchmarks import streamlit_stub
+
+    st = streamlit_stub.install()
+    st.session_state.role = "farmer"
+    from utils.marketplace import marketplace_page
+    from utils.marketplace_store import get_marketplace_store
+
+    def render(i):
+        if i:
+            crops = ["All"] + get_marketplace_store().crops()
+            st.values["Crop"] = crops[i % len(crops)]
+            st.values["Sort by"] = ["Deadline", "Price"][i % 2]
+        marketplace_page()
+
+    return render, 1
+
+
+SCENARIOS = {
+    "recommend_crops": _recommend_crops,
+    "recommend_crops_batch": _recommend_crops_batch,
+    "forecast_prices": _forecast_prices,
+    "price_prediction_page": _price_prediction_page,
+    "price_comparison_page": _price_comparison_page,
+    "validate_login": _validate_login,
+    "register_user": _register_user,
+    "marketplace_page": _marketplace_page,
+}
+
+
+def _run_scenario(name, workdir, seconds, max_calls, seed):
+    os.chdir(workdir)
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    call, items_per_call = SCENARIOS[name](rng)
+    call(0)
+    cold = time.perf_counter() - start
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while len(latencies) < max_calls and time.perf_counter() < deadline:
+        call_start = time.perf_counter()
+        call(len(latencies) + 1)
+        latencies.append(time.perf_counter() - call_start)
+
+    latencies = np.array(latencies) * 1000
+    total_seconds = latencies.sum() / 1000
+    return {
+        "calls": len(latencies),
+        "cold_ms": 1000 * cold,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "calls_per_sec": len(latencies) / total_seconds if total_seconds else None,
+        "items_per_sec": len(latencies) * items_per_call / total_seconds if total_seconds else None,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_scenario(name, workdir, seconds, max_calls, seed=0):
+    """
+    Run one scenario against workdir in a fresh spawned interpreter.
+    """
+    reset_state(workdir)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        return pool.submit(_run_scenario, name, workdir, seconds, max_calls, seed).result()
+
+
+def _git_commit():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                            capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regressions against a baseline results file, as printable lines.
+    """
+    regressions = []
+    for name, sizes in results["results"].items():
+        for size, metrics in sizes.items():
+            old = baseline.get("results", {}).get(name, {}).get(size)
+            if not old:
+                continue
+            for metric in COMPARED_METRICS:
+                if old.get(metric) and metrics[metric] > old[metric] * (1 + tolerance):
+                    regressions.append(f"{name} @ {size} rows: {metric} "
+                                       f"{old[metric]:.2f} -> {metrics[metric]:.2f}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hot paths on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="rows per synthetic CSV (e.g. 1000 100000 10000000)")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--seconds", type=float, default=5.0, help="timed duration per scenario")
+    parser.add_argument("--max-calls", type=int, default=10_000, help="timed calls per scenario")
+    parser.add_argument("--workdir", default=os.path.join(REPO_ROOT, "benchmarks", ".data"),
+                        help="where synthetic datasets are generated and kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seconds": args.seconds,
+            "seed": args.seed,
+        },
+        "results": {name: {} for name in args.scenarios},
+    }
+
+    print(f"{'scenario':<24} {'rows':>10} {'cold ms':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'calls/s':>9} {'RSS MB':>8}")
+    for size in args.sizes:
+        workdir = prepare_workdir(os.path.join(args.workdir, str(size)), size, args.seed)
+        for name in args.scenarios:
+            metrics = run_scenario(name, workdir, args.seconds, args.max_calls, args.seed)
+            results["results"][name][str(size)] = metrics
+            print(f"{name:<24} {size:>10} {metrics['cold_ms']:>10.1f} {metrics['p50_ms']:>9.2f} "
+                  f"{metrics['p95_ms']:>9.2f} {metrics['p99_ms']:>9.2f} "
+                  f"{metrics['calls_per_sec'] or 0:>9.1f} {metrics['peak_rss_mb']:>8.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} regressions against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print(f"\n✅ No regressions against {args.compare}")
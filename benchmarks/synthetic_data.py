@@ -0,0 +1,134 @@
+"""
+Synthetic datasets in the schemas of the CSV files under data/.
+
+Usage:
+    python -m benchmarks.synthetic_data 100000 --workdir benchmarks/.data/100000
+
+Writes data/price_data.csv, data/recommendation_data.csv,
+data/marketplace_data.csv and data/users.csv with the given number of rows
+each, plus a models/ link to the repository's models, so code that uses the
+relative paths in utils/ can run with the workdir as its current directory.
+Generation is seeded and streamed in chunks; existing files are reused.
+"""
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.crop_recommendation import CROP_MAPPING, REGION_MAPPING, SOIL_MAPPING
+
+CHUNK_ROWS = 1_000_000
+# Crops the committed price model has statistics for
+PRICE_CROPS = {"Tomato": 40, "Onion": 30, "Apple": 120, "Banana": 45, "Mango": 90, "Carrot": 35}
+PRICE_MONTHS = 24
+MARKET_CROPS = ["Tomato", "Onion", "Chili", "Cotton", "Sugarcane", "Corn", "Potato", "Wheat"]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _price_chunk(rng, start, stop):
+    row = np.arange(start, stop)
+    crops = np.array(list(PRICE_CROPS))
+    pair, month = row // PRICE_MONTHS, row % PRICE_MONTHS
+    crop = crops[pair % len(crops)]
+    seasonal = 1 + 0.3 * np.sin(2 * np.pi * (month % 12) / 12)
+    base = np.array([PRICE_CROPS[c] for c in crop])
+    dates = pd.date_range("2023-01-01", periods=PRICE_MONTHS, freq="MS")
+    return pd.DataFrame({
+        "Crop": crop,
+        "City": [f"City{p // len(crops):06d}" for p in pair],
+        "Date": dates[month].strftime("%Y-%m-%d"),
+        "Modal Price": np.round(base * seasonal * rng.uniform(0.85, 1.15, len(row))).astype(int),
+        "Seasonal_Index": np.round(seasonal * rng.uniform(0.9, 1.1, len(row)), 2),
+    })
+
+
+def _recommendation_chunk(rng, start, stop):
+    n = stop - start
+    return pd.DataFrame({
+        "soil_type": rng.choice(list(SOIL_MAPPING), n),
+        "region": rng.choice(list(REGION_MAPPING), n),
+        "land_size": rng.integers(1, 51, n),
+        "crop_type": rng.choice(list(CROP_MAPPING.values()), n),
+        "expected_return_per_acre": rng.integers(20_000, 150_000, n),
+        "demand_score": rng.integers(40, 100, n),
+    })
+
+
+def _marketplace_chunk(rng, start, stop):
+    n = stop - start
+    today = date.today()
+    return pd.DataFrame({
+        "Company": [f"Company{i % 5000:04d}" for i in range(start, stop)],
+        "Crop": rng.choice(MARKET_CROPS, n),
+        "Quantity (kg)": rng.integers(100, 50_000, n),
+        "Price (₹/kg)": rng.integers(10, 200, n),
+        "Deadline": [(today + timedelta(days=int(d))).isoformat() for d in rng.integers(-30, 365, n)],
+        "Contact": [f"+91{9000000000 + i}" for i in range(start, stop)],
+    })
+
+
+def _users_chunk(rng, start, stop):
+    n = stop - start
+    return pd.DataFrame({
+        "username": [f"user{i}" for i in range(start, stop)],
+        # Plaintext, like the legacy users.csv; logins upgrade them to hashes
+        "password": [f"pass{i}" for i in range(start, stop)],
+        "role": rng.choice(["farmer", "company"], n),
+    })
+
+
+DATASETS = {
+    "price_data.csv": _price_chunk,
+    "recommendation_data.csv": _recommendation_chunk,
+    "marketplace_data.csv": _marketplace_chunk,
+    "users.csv": _users_chunk,
+}
+
+
+def write_dataset(path, make_chunk, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    tmp_path = f"{path}.tmp"
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = make_chunk(rng, start, min(rows, start + CHUNK_ROWS))
+        chunk.to_csv(tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    os.replace(tmp_path, path)
+
+
+def prepare_workdir(workdir, rows, seed=0):
+    """
+    Create (or reuse) a workdir with synthetic data/ files of rows rows each.
+    """
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    models_link = os.path.join(workdir, "models")
+    if not os.path.exists(models_link):
+        os.symlink(os.path.join(REPO_ROOT, "models"), models_link)
+    for name, make_chunk in DATASETS.items():
+        path = os.path.join(workdir, "data", name)
+        if not os.path.exists(path):
+            write_dataset(path, make_chunk, rows, seed)
+    return workdir
+
+
+def reset_state(workdir):
+    """
+    Remove databases and caches derived from the CSVs so the next run starts cold.
+    """
+    data_dir = os.path.join(workdir, "data")
+    for name in os.listdir(data_dir):
+        if name.endswith((".db", ".db-wal", ".db-shm", ".npz")):
+            os.remove(os.path.join(data_dir, name))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets in the data/ CSV schemas.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--workdir", help="default: benchmarks/.data/<rows>")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = args.workdir or os.path.join(REPO_ROOT, "benchmarks", ".data", str(args.rows))
+    prepare_workdir(workdir, args.rows, args.seed)
+    print(f"✅ Synthetic data with {args.rows} rows per file in {workdir}")
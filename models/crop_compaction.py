@@ -0,0 +1,150 @@
+"""
+Crop model compaction: trade forest size for inference latency.
+
+Usage (from the repository root):
+    python -m models.crop_compaction "data/recommendation_data*.csv" --accuracy-budget 0.02 \\
+        --report models/crop_compaction_report.json --export-flat models/crop_model_flat.joblib
+
+Searches n_estimators / max_depth / min_samples_leaf, scores each candidate on
+a held-out split and measures serialized size, p50/p99 single-row latency and
+batch throughput for both sklearn and the pure-NumPy FlatForest predictor.
+The smallest candidate within the accuracy budget of the best one is chosen;
+it can be saved as a crop model version (see models.crop_training) and/or
+exported as a FlatForest.
+"""
+import argparse
+import itertools
+import json
+import pickle
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from models.crop_training import (
+    FEATURES, data_hash, expand_shards, features_frame, load_training_data, save_version
+)
+from utils.flat_forest import FlatForest
+
+N_ESTIMATORS = [10, 25, 50, 100]
+MAX_DEPTH = [None, 4, 6, 8, 12]
+MIN_SAMPLES_LEAF = [1, 2, 4, 8]
+
+
+def _latency_ms(predict, X, repeats):
+    timings = []
+    for i in range(repeats):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        predict(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def _throughput(predict, X, batch_rows):
+    batch = X[np.arange(batch_rows) % len(X)]
+    start = time.perf_counter()
+    predict(batch)
+    return batch_rows / (time.perf_counter() - start)
+
+
+def evaluate(params, X_train, y_train, X_test, y_test, repeats=200, batch_rows=100_000):
+    model = RandomForestClassifier(random_state=42, n_jobs=1, **params)
+    model.fit(features_frame(X_train), y_train)
+    flat = FlatForest.from_sklearn(model)
+    accuracy = float((model.predict(features_frame(X_test)) == y_test).mean())
+
+    # Single-row latency as the app calls it: a 1x3 array
+    p50, p99 = _latency_ms(model.predict_proba, X_test, repeats)
+    flat_p50, flat_p99 = _latency_ms(flat.predict_proba, X_test, repeats)
+    return model, flat, {
+        **params,
+        "accuracy": accuracy,
+        "node_count": int(sum(e.tree_.node_count for e in model.estimators_)),
+        "pickle_bytes": len(pickle.dumps(model)),
+        "flat_bytes": int(flat.nbytes),
+        "p50_ms": p50,
+        "p99_ms": p99,
+        "flat_p50_ms": flat_p50,
+        "flat_p99_ms": flat_p99,
+        "batch_rows_per_sec": _throughput(model.predict_proba, X_test, batch_rows),
+        "flat_batch_rows_per_sec": _throughput(flat.predict_proba, X_test, batch_rows),
+    }
+
+
+def search(X, y, grid, test_size=0.25, **kwargs):
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+    results = []
+    for n_estimators, max_depth, min_samples_leaf in grid:
+        params = {"n_estimators": n_estimators, "max_depth": max_depth,
+                  "min_samples_leaf": min_samples_leaf}
+        model, flat, result = evaluate(params, X_train, y_train, X_test, y_test, **kwargs)
+        results.append((model, flat, result))
+    return results
+
+
+def choose(results, accuracy_budget):
+    """
+    Smallest model whose accuracy is within the budget of the best candidate.
+    """
+    best_accuracy = max(result["accuracy"] for _, _, result in results)
+    eligible = [r for r in results if r[2]["accuracy"] >= best_accuracy - accuracy_budget]
+    return min(eligible, key=lambda r: (r[2]["pickle_bytes"], r[2]["p50_ms"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search for a smaller, faster crop model.")
+    parser.add_argument("shards", nargs="+", help="CSV paths or glob patterns")
+    parser.add_argument("--accuracy-budget", type=float, default=0.02,
+                        help="max accuracy loss allowed versus the best candidate")
+    parser.add_argument("--repeats", type=int, default=200, help="single-row predictions to time")
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    parser.add_argument("--report", default="models/crop_compaction_report.json")
+    parser.add_argument("--save-version", action="store_true",
+                        help="save the chosen model to models/crop_versions")
+    parser.add_argument("--export-flat", help="write the chosen model as a FlatForest joblib file")
+    args = parser.parse_args()
+
+    paths = expand_shards(args.shards)
+    X, y = load_training_data(paths)
+    grid = list(itertools.product(N_ESTIMATORS, MAX_DEPTH, MIN_SAMPLES_LEAF))
+    results = search(X, y, grid, repeats=args.repeats, batch_rows=args.batch_rows)
+    model, flat, chosen = choose(results, args.accuracy_budget)
+
+    print(f"{'trees':>5} {'depth':>5} {'leaf':>4} {'acc':>6} {'KB':>8} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'flat p50':>8} {'rows/s':>10} {'flat rows/s':>11}")
+    for _, _, r in sorted(results, key=lambda r: r[2]["pickle_bytes"]):
+        print(f"{r['n_estimators']:>5} {str(r['max_depth']):>5} {r['min_samples_leaf']:>4} "
+              f"{r['accuracy']:>6.3f} {r['pickle_bytes'] / 1024:>8.1f} {r['p50_ms']:>7.2f} "
+              f"{r['p99_ms']:>7.2f} {r['flat_p50_ms']:>8.3f} {r['batch_rows_per_sec']:>10.0f} "
+              f"{r['flat_batch_rows_per_sec']:>11.0f}")
+    print(f"\nChosen: {json.dumps({k: chosen[k] for k in ('n_estimators', 'max_depth', 'min_samples_leaf')})} "
+          f"accuracy={chosen['accuracy']:.3f} size={chosen['pickle_bytes'] / 1024:.1f} KB")
+
+    with open(args.report, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "features": FEATURES,
+                   "rows": int(len(y)), "accuracy_budget": args.accuracy_budget,
+                   "chosen": chosen, "candidates": [r for _, _, r in results]}, f, indent=2)
+    print(f"✅ Report written to {args.report}")
+
+    if args.save_version:
+        version = save_version(model, {
+            "version": datetime.now().strftime("%Y%m%dT%H%M%S"),
+            "parent_version": None,
+            "mode": "compacted",
+            "shards": paths,
+            "rows": int(len(y)),
+            "total_rows": int(len(y)),
+            "data_hash": data_hash(paths),
+            "n_estimators": model.n_estimators,
+            "params": {k: chosen[k] for k in ("n_estimators", "max_depth", "min_samples_leaf")},
+            "trained_at": datetime.now().isoformat(),
+            "training_seconds": None,
+        })
+        print(f"✅ Saved compacted model as version {version}; publish it with models.crop_training")
+    if args.export_flat:
+        joblib.dump(flat, args.export_flat)
+        print(f"✅ Exported FlatForest to {args.export_flat}")
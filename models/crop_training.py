@@ -0,0 +1,271 @@
+"""
+Crop model training pipeline.
+
+Usage (from the repository root):
+    # Full retrain over every shard, then make it the live model
+    python -m models.crop_training train "data/recommendation_data*.csv" --publish
+
+    # Nightly update: add trees fitted on the new shard only
+    python -m models.crop_training update data/recommendation_2025-06-01.csv --trees 20 --publish
+
+    # Roll back / forward to any saved version
+    python -m models.crop_training publish 20250601T020000
+
+Each run writes models/crop_versions/<version>.joblib plus a <version>.json
+with row count, data hash, training time and lineage. Publishing copies the
+artifact next to models/crop_model.pkl and renames it into place, so the app's
+model registry picks up the new version on its next request without ever
+seeing a half-written file.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from utils.file_cache import file_digest
+from utils.model_registry import CROP_MODEL_FILE
+from utils.recommendation_table import build_recommendation_table
+
+VERSIONS_DIR = "models/crop_versions"
+CURRENT_FILE = os.path.join(VERSIONS_DIR, "CURRENT")
+
+FEATURES = ["soil_type", "region", "land_size"]
+TARGET = "crop_type"
+
+soil_mapping = {
+    "Loamy": 0,
+    "Sandy": 1,
+    "Clay": 2,
+    "Silty": 3,
+    "Peaty": 4
+}
+
+region_mapping = {
+    "North Karnataka": 0,
+    "South Karnataka": 1,
+    "Coastal Karnataka": 2,
+    "Central Karnataka": 3
+}
+
+crop_mapping = {
+    "Tomato": 0,
+    "Onion": 1,
+    "Chili": 2,
+    "Cotton": 3,
+    "Sugarcane": 4,
+    "Corn": 5
+}
+
+
+def expand_shards(patterns):
+    """
+    Sorted list of CSV shard paths matching the given paths or glob patterns.
+    """
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        raise FileNotFoundError(f"No data shards match {patterns}")
+    return paths
+
+
+def iter_encoded_chunks(paths, chunksize=500_000):
+    """
+    Stream (X, y) chunks from CSV shards with categoricals mapped to codes.
+    Rows with unknown categories are dropped, as in cr.py.
+    """
+    for path in paths:
+        for chunk in pd.read_csv(path, usecols=FEATURES + [TARGET], chunksize=chunksize):
+            chunk["soil_type"] = chunk["soil_type"].map(soil_mapping)
+            chunk["region"] = chunk["region"].map(region_mapping)
+            chunk[TARGET] = chunk[TARGET].map(crop_mapping)
+            chunk = chunk.dropna()
+            yield chunk[FEATURES].to_numpy(dtype=np.float32), chunk[TARGET].to_numpy(dtype=np.int8)
+
+
+def load_training_data(paths, chunksize=500_000):
+    """
+    Concatenate encoded chunks into compact float32/int8 arrays.
+    """
+    X_parts, y_parts = [], []
+    for X, y in iter_encoded_chunks(paths, chunksize):
+        X_parts.append(X)
+        y_parts.append(y)
+    if not X_parts:
+        raise ValueError("No usable training rows in the given shards")
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+def data_hash(paths):
+    """
+    Combined SHA-256 over the contents of every shard, in order.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+
+def features_frame(X):
+    # Keep the feature names the app's model has always been trained with
+    return pd.DataFrame(X, columns=FEATURES)
+
+
+def save_version(model, metadata):
+    """
+    Write models/crop_versions/<version>.joblib and its metadata JSON.
+    """
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    version = metadata["version"]
+    joblib.dump(model, os.path.join(VERSIONS_DIR, f"{version}.joblib"))
+    with open(os.path.join(VERSIONS_DIR, f"{version}.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+    return version
+
+
+def load_version(version):
+    model = joblib.load(os.path.join(VERSIONS_DIR, f"{version}.joblib"))
+    with open(os.path.join(VERSIONS_DIR, f"{version}.json")) as f:
+        metadata = json.load(f)
+    return model, metadata
+
+
+def current_version():
+    if not os.path.exists(CURRENT_FILE):
+        return None
+    with open(CURRENT_FILE) as f:
+        return f.read().strip() or None
+
+
+def publish(version):
+    """
+    Atomically make a saved version the model the app serves.
+    """
+    source = os.path.join(VERSIONS_DIR, f"{version}.joblib")
+    tmp_path = f"{CROP_MODEL_FILE}.tmp"
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, CROP_MODEL_FILE)
+
+    tmp_current = f"{CURRENT_FILE}.tmp"
+    with open(tmp_current, "w") as f:
+        f.write(version)
+    os.replace(tmp_current, CURRENT_FILE)
+
+    # The lookup table is tied to the model file's digest; until it is rebuilt
+    # recommend_crops falls back to the model
+    build_recommendation_table(CROP_MODEL_FILE)
+
+
+def _new_version():
+    return datetime.now().strftime("%Y%m%dT%H%M%S")
+
+
+def train_full(patterns, n_estimators=100, chunksize=500_000, random_state=42):
+    """
+    Train a new forest on every shard using all cores.
+    """
+    paths = expand_shards(patterns)
+    start = time.perf_counter()
+    X, y = load_training_data(paths, chunksize)
+    model = RandomForestClassifier(n_estimators=n_estimators, n_jobs=-1, random_state=random_state)
+    model.fit(features_frame(X), y)
+    metadata = {
+        "version": _new_version(),
+        "parent_version": None,
+        "mode": "full",
+        "shards": paths,
+        "rows": int(len(y)),
+        "total_rows": int(len(y)),
+        "data_hash": data_hash(paths),
+        "n_estimators": model.n_estimators,
+        "trained_at": datetime.now().isoformat(),
+        "training_seconds": time.perf_counter() - start,
+    }
+    save_version(model, metadata)
+    return model, metadata
+
+
+def train_incremental(patterns, base_version=None, trees=20, chunksize=500_000):
+    """
+    Grow an existing forest with `trees` new trees fitted on the new shards only.
+
+    The existing trees are kept as-is, so the cost depends on the size of the
+    new data, not on the whole history. The new data must contain exactly the
+    crop classes the model already knows; a new or missing crop needs a full
+    retrain.
+    """
+    base_version = base_version or current_version()
+    if base_version is None:
+        raise ValueError("No base version to update; run a full train first")
+    model, base_metadata = load_version(base_version)
+
+    paths = expand_shards(patterns)
+    start = time.perf_counter()
+    X, y = load_training_data(paths, chunksize)
+    known, seen = set(model.classes_), set(np.unique(y))
+    if seen != known:
+        # Warm-started trees must share the forest's class list: a missing
+        # crop breaks their votes and a new one can never be predicted
+        raise ValueError(f"New data has crop classes {sorted(seen)} but the model has "
+                         f"{sorted(known)}; run a full train instead.")
+
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + trees, n_jobs=-1)
+    model.fit(features_frame(X), y)
+    model.set_params(warm_start=False)
+    metadata = {
+        "version": _new_version(),
+        "parent_version": base_version,
+        "mode": "incremental",
+        "shards": paths,
+        "rows": int(len(y)),
+        "total_rows": int(base_metadata["total_rows"] + len(y)),
+        "data_hash": data_hash(paths),
+        "n_estimators": model.n_estimators,
+        "trained_at": datetime.now().isoformat(),
+        "training_seconds": time.perf_counter() - start,
+    }
+    save_version(model, metadata)
+    return model, metadata
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train, update and publish crop model versions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="full retrain over all shards")
+    train_parser.add_argument("shards", nargs="+", help="CSV paths or glob patterns")
+    train_parser.add_argument("--trees", type=int, default=100)
+    train_parser.add_argument("--chunksize", type=int, default=500_000)
+    train_parser.add_argument("--publish", action="store_true")
+
+    update_parser = subparsers.add_parser("update", help="warm-start new trees on new shards")
+    update_parser.add_argument("shards", nargs="+", help="CSV paths or glob patterns")
+    update_parser.add_argument("--trees", type=int, default=20)
+    update_parser.add_argument("--base", help="version to update (default: the published one)")
+    update_parser.add_argument("--chunksize", type=int, default=500_000)
+    update_parser.add_argument("--publish", action="store_true")
+
+    publish_parser = subparsers.add_parser("publish", help="make a saved version live")
+    publish_parser.add_argument("version")
+
+    args = parser.parse_args()
+    if args.command == "publish":
+        publish(args.version)
+        print(f"✅ Published crop model {args.version} to {CROP_MODEL_FILE}")
+    else:
+        if args.command == "train":
+            _, metadata = train_full(args.shards, args.trees, args.chunksize)
+        else:
+            _, metadata = train_incremental(args.shards, args.base, args.trees, args.chunksize)
+        print(f"✅ Trained crop model {metadata['version']} on {metadata['rows']} rows "
+              f"in {metadata['training_seconds']:.1f}s ({metadata['n_estimators']} trees)")
+        if args.publish:
+            publish(metadata["version"])
+            print(f"✅ Published crop model {metadata['version']} to {CROP_MODEL_FILE}")
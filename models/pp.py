@@ -1,21 +1,12 @@
-import pandas as pd
-import pickle
-from sklearn.linear_model import LinearRegression
-
-# Load the price data
-data = pd.read_csv("data/price_data.csv")
-
-# Prepare the data for training
-data["Month"] = pd.to_datetime(data["Date"]).dt.month
-X = data[["Month"]]  # Input features (Month)
-y = data["Modal Price"]  # Target variable (Price)
-
-# Train the model
-model = LinearRegression()
-model.fit(X, y)
-
-# Save the trained model to a file
-with open("models/price_model.pkl", "wb") as f:
-    pickle.dump(model, f)
-
-print("Price prediction model saved to models/price_model.pkl")
\ No newline at end of file
+# Trains the price model artifact the app loads. Kept so existing
+# "python models/pp.py" invocations keep working; the implementation lives
+# in models/price_training.py (python -m models.price_training).
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Imported rather than run as __main__, so the --per-crop worker functions
+# are pickled by reference to models.price_training
+from models.price_training import main
+
+main()
@@ -0,0 +1,187 @@
+"""
+Price model training: builds the artifact utils/price_prediction.py loads.
+
+Usage (from the repository root):
+    python -m models.price_training                     # one global model
+    python -m models.price_training --per-crop --workers 4
+
+The features are exactly the ones the forecaster feeds the model (one-hot
+Crop, cyclical month, seasonal index, lagged price, 3-month moving average,
+per-crop min/max/mean and trend), computed with grouped pandas operations over
+every crop and city at once. The artifact carries a schema version and the
+feature names so the app validates it on load. It is written atomically to
+models/price_model.pkl, with a versioned copy and a timing report in
+models/price_versions/.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.preprocessing import OneHotEncoder
+
+from utils.model_registry import PRICE_MODEL_FILE
+from utils.price_forecast import (
+    FEATURE_COLUMNS, PRICE_ARTIFACT_SCHEMA_VERSION, PRICE_DATA_FILE, PerCropRegressor,
+    load_price_history, validate_price_artifact
+)
+
+VERSIONS_DIR = "models/price_versions"
+
+MODEL_PARAMS = {"n_estimators": 100, "learning_rate": 0.05, "max_depth": 3, "random_state": 42}
+
+
+def crop_statistics(history):
+    """
+    Per-crop price min/max/mean and linear trend (price change per day).
+    """
+    historical_stats = history.groupby("Crop")["Modal Price"].agg(["min", "max", "mean"]).reset_index()
+
+    # Least-squares slope per crop from grouped sums, without a per-crop polyfit
+    days = (history["Date"] - pd.Timestamp("1970-01-01")).dt.days.astype(float)
+    prices = history["Modal Price"].astype(float)
+    frame = pd.DataFrame({"Crop": history["Crop"], "x": days, "y": prices})
+    grouped = frame.groupby("Crop")
+    x_centered = frame["x"] - grouped["x"].transform("mean")
+    y_centered = frame["y"] - grouped["y"].transform("mean")
+    covariance = (x_centered * y_centered).groupby(frame["Crop"]).sum()
+    variance = (x_centered ** 2).groupby(frame["Crop"]).sum()
+    trend = (covariance / variance.replace(0, np.nan)).fillna(0.0).to_dict()
+    return historical_stats, trend
+
+
+def build_features(history, encoder, historical_stats, trend):
+    """
+    Training matrix for every (Crop, City) series at once.
+
+    Lagged_Price is the previous month's price and Price_MA3 the mean of the
+    previous three, matching the state the forecaster carries forward.
+    """
+    history = history.sort_values(["Crop", "City", "Date"], kind="stable").reset_index(drop=True)
+    by_pair = history.groupby(["Crop", "City"], sort=False)["Modal Price"]
+    lagged = by_pair.shift(1)
+    ma3 = (lagged.groupby([history["Crop"], history["City"]], sort=False)
+                 .rolling(3, min_periods=1).mean()
+                 .reset_index(level=[0, 1], drop=True)
+                 .sort_index())
+
+    month = history["Date"].dt.month
+    stats = historical_stats.set_index("Crop").loc[history["Crop"], ["min", "max", "mean"]]
+    numeric = pd.DataFrame({
+        "Month_sin": np.sin(2 * np.pi * month / 12),
+        "Month_cos": np.cos(2 * np.pi * month / 12),
+        "Seasonal_Index": history["Seasonal_Index"],
+        "Lagged_Price": lagged,
+        "Price_MA3": ma3,
+        "min": stats["min"].to_numpy(),
+        "max": stats["max"].to_numpy(),
+        "mean": stats["mean"].to_numpy(),
+        "Trend": history["Crop"].map(trend),
+    })
+    encoded = pd.DataFrame(encoder.transform(history[["Crop"]]),
+                           columns=encoder.get_feature_names_out(["Crop"]))
+    features = pd.concat([encoded, numeric[FEATURE_COLUMNS]], axis=1)
+
+    # The first month of each series has no lag to learn from
+    usable = lagged.notna().to_numpy()
+    target = history["Modal Price"][usable].reset_index(drop=True)
+    crops = history["Crop"][usable].reset_index(drop=True)
+    return features[usable].reset_index(drop=True), target, crops
+
+
+def _fit(X, y):
+    return GradientBoostingRegressor(**MODEL_PARAMS).fit(X, y)
+
+
+def train(history, per_crop=False, workers=None):
+    """
+    Fit the price model and return (artifact, timings in seconds).
+    """
+    timings = {}
+    start = time.perf_counter()
+    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False).fit(history[["Crop"]])
+    historical_stats, trend = crop_statistics(history)
+    X, y, crops = build_features(history, encoder, historical_stats, trend)
+    timings["features"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if per_crop:
+        # Each crop's model is independent, so fit them in parallel processes
+        crop_names = sorted(crops.unique())
+        with ProcessPoolExecutor(workers) as pool:
+            fitted = pool.map(_fit, [X[crops == crop] for crop in crop_names],
+                              [y[crops == crop] for crop in crop_names])
+            models = {f"Crop_{crop}": model for crop, model in zip(crop_names, fitted)}
+        model = PerCropRegressor(models, list(encoder.get_feature_names_out(["Crop"])))
+    else:
+        model = _fit(X, y)
+    timings["fit"] = time.perf_counter() - start
+
+    artifact = {
+        "schema_version": PRICE_ARTIFACT_SCHEMA_VERSION,
+        "version": datetime.now().strftime("%Y%m%dT%H%M%S"),
+        "trained_at": datetime.now().isoformat(),
+        "mode": "per_crop" if per_crop else "global",
+        "rows": int(len(y)),
+        "crops": sorted(history["Crop"].unique()),
+        "cities": sorted(history["City"].unique()),
+        "feature_names": list(X.columns),
+        "model": model,
+        "encoder": encoder,
+        "historical_stats": historical_stats,
+        "trend": trend,
+    }
+    return validate_price_artifact(artifact), timings
+
+
+def save(artifact, timings, path=PRICE_MODEL_FILE):
+    """
+    Write the versioned copy and timing report, then swap the live artifact in.
+    """
+    start = time.perf_counter()
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    version_path = os.path.join(VERSIONS_DIR, f"{artifact['version']}.joblib")
+    joblib.dump(artifact, version_path)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+    timings["save"] = time.perf_counter() - start
+
+    report = {key: artifact[key] for key in ("version", "trained_at", "mode", "rows", "crops", "cities")}
+    report["timings_seconds"] = timings
+    with open(os.path.join(VERSIONS_DIR, f"{artifact['version']}.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the price prediction model artifact.")
+    parser.add_argument("--data", help=f"CSV file or price store directory "
+                                        f"(default: the store if populated, else {PRICE_DATA_FILE})")
+    parser.add_argument("--crops", nargs="+", help="train on these crops only")
+    parser.add_argument("--per-crop", action="store_true", help="fit one model per crop")
+    parser.add_argument("--workers", type=int, help="process pool size for --per-crop")
+    parser.add_argument("--output", default=PRICE_MODEL_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    history = load_price_history(args.data, crops=args.crops)
+    load_seconds = time.perf_counter() - start
+    artifact, timings = train(history, per_crop=args.per_crop, workers=args.workers)
+    timings = {"load": load_seconds, **timings}
+    report = save(artifact, timings, args.output)
+
+    print(f"✅ Price model {artifact['version']} ({artifact['mode']}, {artifact['rows']} rows) "
+          f"saved to {args.output}")
+    for stage, seconds in report["timings_seconds"].items():
+        print(f"   {stage:<9} {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+import pytest
+
+from models import crop_training
+
+
+def write_shard(path, crops):
+    rows = [
+        {"soil_type": soil, "region": region, "land_size": 1.0 + i, "crop_type": crop}
+        for i, (crop, soil, region) in enumerate(
+            (crop, soil, region)
+            for crop in crops
+            for soil in ("Loamy", "Clay")
+            for region in ("North Karnataka", "South Karnataka")
+        )
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def versions_dir(tmp_path, monkeypatch):
+    versions = tmp_path / "crop_versions"
+    monkeypatch.setattr(crop_training, "VERSIONS_DIR", str(versions))
+    return versions
+
+
+def test_update_with_an_unseen_crop_needs_a_full_train(tmp_path, versions_dir):
+    base_shard = write_shard(tmp_path / "base.csv", ["Tomato", "Onion"])
+    _, base = crop_training.train_full([base_shard], n_estimators=5)
+    saved = set(os.listdir(versions_dir))
+
+    update_shard = write_shard(tmp_path / "update.csv", ["Tomato", "Onion", "Chili"])
+    with pytest.raises(ValueError, match="full train"):
+        crop_training.train_incremental([update_shard], base_version=base["version"], trees=2)
+
+    assert set(os.listdir(versions_dir)) == saved
+
+
+def test_update_missing_a_known_crop_needs_a_full_train(tmp_path, versions_dir):
+    base_shard = write_shard(tmp_path / "base.csv", ["Tomato", "Onion"])
+    _, base = crop_training.train_full([base_shard], n_estimators=5)
+
+    update_shard = write_shard(tmp_path / "update.csv", ["Tomato"])
+    with pytest.raises(ValueError, match="full train"):
+        crop_training.train_incremental([update_shard], base_version=base["version"], trees=2)
+
+
+def test_update_with_the_same_crops_adds_trees(tmp_path, versions_dir):
+    base_shard = write_shard(tmp_path / "base.csv", ["Tomato", "Onion"])
+    _, base = crop_training.train_full([base_shard], n_estimators=5)
+
+    update_shard = write_shard(tmp_path / "update.csv", ["Onion", "Tomato"])
+    model, metadata = crop_training.train_incremental([update_shard], base_version=base["version"], trees=2)
+
+    assert model.n_estimators == 7
+    assert metadata["parent_version"] == base["version"]
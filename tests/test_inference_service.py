@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+
+from utils import inference_service
+from utils.crop_recommendation import validate_farm
+
+
+class JsonRequest:
+    """
+    The parts of a Starlette request the POST handlers read.
+    """
+
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+
+def post(handler, body):
+    response = asyncio.run(handler(JsonRequest(body)))
+    return response.status_code, json.loads(response.body)
+
+
+@pytest.mark.parametrize("pair", [
+    {"crop": ["Tomato"], "city": "Delhi"},
+    {"crop": "Tomato", "city": ["Delhi"]},
+    {"crop": "Tomato"},
+    ["Tomato", "Delhi"],
+    "Tomato",
+])
+def test_forecast_batch_rejects_malformed_pairs(pair):
+    status, body = post(inference_service.forecast_batch, {"pairs": [pair]})
+    assert status == 400
+    assert "error" in body
+
+
+def test_forecast_batch_rejects_pairs_that_are_not_a_list():
+    status, _ = post(inference_service.forecast_batch, {"pairs": {"crop": "Tomato", "city": "Delhi"}})
+    assert status == 400
+
+
+@pytest.mark.parametrize("land_area", [True, False])
+def test_validate_farm_rejects_booleans(land_area):
+    with pytest.raises(ValueError, match="Land area"):
+        validate_farm("North Karnataka", "Loamy", land_area)
+
+
+@pytest.mark.parametrize("farm", [
+    {"place": "North Karnataka", "soil": "Loamy", "land_area": True},
+    {"place": ["North Karnataka"], "soil": "Loamy", "land_area": 2},
+    {"place": "North Karnataka", "soil": {"type": "Loamy"}, "land_area": 2},
+])
+def test_recommend_rejects_malformed_farms(farm):
+    status, body = post(inference_service.recommend, farm)
+    assert status == 400
+    assert "error" in body
+
+    status, _ = post(inference_service.recommend_batch, {"farms": [farm]})
+    assert status == 400
+
+
+def test_validate_farm_accepts_numbers():
+    validate_farm("North Karnataka", "Loamy", 2)
+    validate_farm("South Karnataka", "Clay", 0.5)
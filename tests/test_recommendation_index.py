@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from utils.recommendation_index import build_index
+
+
+def test_means_skip_missing_values_like_groupby_mean(tmp_path):
+    rows = pd.DataFrame({
+        "region": ["North Karnataka"] * 3 + ["South Karnataka"],
+        "crop_type": ["Rice", "Rice", "Rice", "Maize"],
+        "expected_return_per_acre": [100.0, np.nan, 200.0, np.nan],
+        "demand_score": [0.2, 0.4, np.nan, 0.9],
+    })
+    path = tmp_path / "recommendation_data.csv"
+    rows.to_csv(path, index=False)
+
+    index = build_index(str(path), chunksize=2)
+
+    expected = rows.groupby(["region", "crop_type"]).mean()
+    for (region, crop), means in expected.iterrows():
+        mean_return, mean_demand, count = index.lookup(region, crop)
+        np.testing.assert_allclose(mean_return, means["expected_return_per_acre"])
+        np.testing.assert_allclose(mean_demand, means["demand_score"])
+    assert index.lookup("North Karnataka", "Rice")[2] == 3
+    assert index.lookup("South Karnataka", "Maize")[2] == 1
@@ -0,0 +1,34 @@
+import threading
+
+from utils.user_store import SqliteUserStore
+
+
+def test_password_change_from_another_connection_is_seen(tmp_path):
+    path = str(tmp_path / "users.db")
+    app = SqliteUserStore(path)
+    other = SqliteUserStore(path)  # stands in for another worker process
+    assert app.add_user("asha", "old-hash", "farmer")
+    assert app.get_user("asha")["password"] == "old-hash"
+
+    other.update_password("asha", "new-hash")
+
+    assert app.get_user("asha")["password"] == "new-hash"
+
+
+def test_password_change_from_another_thread_is_seen(tmp_path):
+    store = SqliteUserStore(str(tmp_path / "users.db"))
+    store.add_user("asha", "old-hash", "farmer")
+    assert store.get_user("asha")["password"] == "old-hash"
+
+    worker = threading.Thread(target=store.update_password, args=("asha", "new-hash"))
+    worker.start()
+    worker.join()
+
+    assert store.get_user("asha")["password"] == "new-hash"
+
+
+def test_unchanged_users_are_served_from_cache(tmp_path):
+    store = SqliteUserStore(str(tmp_path / "users.db"))
+    store.add_user("asha", "hash", "farmer")
+    first = store.get_user("asha")
+    assert store.get_user("asha") is first
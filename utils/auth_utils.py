@@ -1,36 +1,27 @@
-import pandas as pd
-import os
-
-USER_FILE = "data/users.csv"
-
-def load_users():
-    if not os.path.exists(USER_FILE):
-        users_df = pd.DataFrame(columns=["username", "password", "role"])
-        users_df.to_csv(USER_FILE, index=False)
-    else:
-        users_df = pd.read_csv(USER_FILE)
-    return users_df
-
-def save_users(users_df):
-    users_df.to_csv(USER_FILE, index=False)
+from utils.passwords import hash_password, needs_rehash, verify_password
+from utils.user_store import get_user_store
 
 def validate_login(username, password, role):
-    users = load_users()
-    user_match = users[
-        (users["username"] == username) &
-        (users["password"] == password) &
-        (users["role"] == role)
-    ]
-    return not user_match.empty
+    store = get_user_store()
+    user = store.get_user(username)
+    if user is None or user["role"] != role:
+        return False
+    if not verify_password(password, user["password"]):
+        return False
+
+    # Plaintext rows and hashes with an outdated cost are upgraded on login
+    if needs_rehash(user["password"]):
+        store.update_password(username, hash_password(password))
+    return True
 
 def register_user(username, password, role):
-    users = load_users()
-    if username in users["username"].values:
+    store = get_user_store()
+    if store.get_user(username) is not None:
         return "⚠️ Username already exists."
     elif not username or not password:
         return "⚠️ Please fill in all fields."
+    elif not store.add_user(username, hash_password(password), role):
+        # Another session took the name between the check and the insert
+        return "⚠️ Username already exists."
     else:
-        new_entry = pd.DataFrame([[username, password, role]], columns=["username", "password", "role"])
-        users = pd.concat([users, new_entry], ignore_index=True)
-        save_users(users)
         return "🎉 Account created!"
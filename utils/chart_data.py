@@ -0,0 +1,192 @@
+"""
+Chart data for price history plots: multi-resolution aggregates, LTTB
+downsampling to a point budget and a cache of finished figures.
+
+A long daily feed can hold tens of thousands of points per crop/city, far
+more than a chart is wide. History is aggregated per pair at daily, weekly and
+monthly resolution, each once per data version. The chosen series is then
+downsampled with Largest-Triangle-Three-Buckets, which keeps peaks and troughs
+that plain averaging would flatten. The finished figure is cached per
+(crop, city, data and model version, horizon, resolution, budget), so reruns
+hand Streamlit an existing figure instead of building and validating a new one.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.instrumentation import increment, span
+
+# Pandas resample rules, finest first
+RESOLUTIONS = {"daily": "D", "weekly": "W-MON", "monthly": "MS"}
+# Roughly one point per horizontal pixel of a page-wide chart
+DEFAULT_MAX_POINTS = 800
+# Above this many points markers are dropped and only the line is drawn
+MAX_MARKER_POINTS = 120
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the n_out points Largest-Triangle-Three-Buckets keeps.
+    x must be increasing; the first and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # n - 2 inner points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # The next bucket's average is the third corner of the triangle
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[bucket + 1] = previous
+    return keep
+
+
+def aggregate(series, resolution):
+    """
+    Mean price per period of a Date-indexed price series. Empty periods are
+    dropped rather than filled.
+    """
+    return series.resample(RESOLUTIONS[resolution]).mean().dropna()
+
+
+def downsample(series, max_points=DEFAULT_MAX_POINTS):
+    """
+    series itself when it fits max_points, else its LTTB-selected points.
+    """
+    if len(series) <= max_points:
+        return series
+    keep = lttb(series.index.asi8, series.to_numpy(), max_points)
+    return series.iloc[keep]
+
+
+class ChartData:
+    """
+    Per-pair aggregates and plotly figures, both keyed by data version so
+    a new price history is picked up on the next request.
+    """
+
+    def __init__(self, max_pairs=1024, max_figures=256):
+        self.max_pairs = max_pairs
+        self.max_figures = max_figures
+        self._aggregates = OrderedDict()
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, entries, key):
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+            return value
+
+    def _store(self, entries, key, value, limit):
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > limit:
+                entries.popitem(last=False)
+
+    def _pair_aggregates(self, history, crop, city, data_version):
+        # {resolution: series}, with the unaggregated series under None
+        key = (crop, city, data_version)
+        aggregates = self._cached(self._aggregates, key)
+        if aggregates is None:
+            with span("chart.pair_history"):
+                rows = history[(history["Crop"] == crop) & (history["City"] == city)]
+                aggregates = {None: rows.groupby("Date")["Modal Price"].mean().sort_index()}
+            self._store(self._aggregates, key, aggregates, self.max_pairs)
+        return aggregates
+
+    def pair_history(self, history, crop, city, data_version):
+        """
+        Date-indexed mean price per observed date of one pair; empty without data.
+        """
+        return self._pair_aggregates(history, crop, city, data_version)[None]
+
+    def aggregate(self, history, crop, city, data_version, resolution):
+        """
+        Date-indexed mean price series of one pair at resolution. Each
+        resolution is resampled the first time it is asked for.
+        """
+        aggregates = self._pair_aggregates(history, crop, city, data_version)
+        series = aggregates.get(resolution)
+        if series is None:
+            with span("chart.aggregate"):
+                series = aggregates[resolution] = aggregate(aggregates[None], resolution)
+        return series
+
+    def series(self, history, crop, city, data_version, resolution="auto",
+               max_points=DEFAULT_MAX_POINTS):
+        """
+        History to plot and the resolution used. "auto" picks the finest
+        resolution that fits max_points, else the coarsest; the result is
+        LTTB-downsampled to max_points either way.
+        """
+        if resolution == "auto":
+            for resolution in RESOLUTIONS:
+                series = self.aggregate(history, crop, city, data_version, resolution)
+                if len(series) <= max_points:
+                    break
+        else:
+            series = self.aggregate(history, crop, city, data_version, resolution)
+        return downsample(series, max_points), resolution
+
+    def figure(self, history, forecast, crop, city, versions, resolution="auto",
+               max_points=DEFAULT_MAX_POINTS):
+        """
+        Plotly figure of history plus forecast, or None without history. The
+        figure is shared between callers and must not be modified.
+        """
+        key = (crop, city, versions, len(forecast), resolution, max_points)
+        cached = self._cached(self._figures, key)
+        if cached is not None:
+            increment("chart.figure_cache.hits")
+            return cached
+        increment("chart.figure_cache.misses")
+
+        series, used = self.series(history, crop, city, versions[0], resolution, max_points)
+        if series.empty:
+            return None
+
+        import plotly.graph_objs as go
+
+        with span("render.price_figure"):
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=series.index,
+                y=series.to_numpy(),
+                mode="lines+markers" if len(series) <= MAX_MARKER_POINTS else "lines",
+                name=f"Historical Prices ({used})"
+            ))
+            fig.add_trace(go.Scatter(
+                x=forecast["Date"].dt.strftime("%Y-%m-%d"),
+                y=forecast["Predicted Price"],
+                mode="lines+markers",
+                name="Predicted Prices"
+            ))
+            fig.update_layout(
+                xaxis_title="Date",
+                yaxis_title="Price (INR)",
+                title=f"Price Prediction for {crop} in {city}",
+                hovermode="x unified"
+            )
+        self._store(self._figures, key, fig, self.max_figures)
+        return fig
+
+
+chart_data = ChartData()
@@ -0,0 +1,42 @@
+import os
+
+# Each setting can be overridden with the AGRI_* environment variable next to it,
+# e.g. AGRI_USER_STORE=csv.
+
+# User accounts: "sqlite" (default) or "csv" (legacy data/users.csv)
+USER_STORE_BACKEND = os.environ.get("AGRI_USER_STORE", "sqlite")
+USER_FILE = os.environ.get("AGRI_USER_FILE", "data/users.csv")
+USER_DB_FILE = os.environ.get("AGRI_USER_DB_FILE", "data/users.db")
+
+# Password hashing: "scrypt" (default) or "pbkdf2_sha256". The cost is log2(N)
+# for scrypt and the iteration count for PBKDF2; raise it as hardware allows.
+PASSWORD_HASH_ALGORITHM = os.environ.get("AGRI_PASSWORD_HASH_ALGORITHM", "scrypt")
+PASSWORD_HASH_COST = int(os.environ.get(
+    "AGRI_PASSWORD_HASH_COST", 14 if PASSWORD_HASH_ALGORITHM == "scrypt" else 600_000
+))
+
+# Marketplace postings: SQLite store, seeded from the legacy CSV on first run
+MARKETPLACE_FILE = os.environ.get("AGRI_MARKETPLACE_FILE", "data/marketplace_data.csv")
+MARKETPLACE_DB_FILE = os.environ.get("AGRI_MARKETPLACE_DB_FILE", "data/marketplace.db")
+MARKETPLACE_PAGE_SIZE = int(os.environ.get("AGRI_MARKETPLACE_PAGE_SIZE", 50))
+
+# Show import and per-rerun timings in the app sidebar (AGRI_SHOW_TIMINGS=1)
+SHOW_TIMINGS = os.environ.get("AGRI_SHOW_TIMINGS", "0") == "1"
+
+# Inference service (python -m utils.inference_service). Each worker process
+# serves requests with its own copy of the (memory-mapped) models; requests
+# arriving within MAX_WAIT_MS of each other are batched into one predict call.
+SERVICE_HOST = os.environ.get("AGRI_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("AGRI_SERVICE_PORT", 8000))
+SERVICE_WORKERS = int(os.environ.get("AGRI_SERVICE_WORKERS", os.cpu_count() or 1))
+SERVICE_MAX_BATCH_SIZE = int(os.environ.get("AGRI_SERVICE_MAX_BATCH_SIZE", 256))
+SERVICE_MAX_WAIT_MS = float(os.environ.get("AGRI_SERVICE_MAX_WAIT_MS", 5))
+
+# Instrumentation (utils.instrumentation): a port for the /metrics endpoint
+# (0 = off), a JSON-lines file that gets one line per timed span, and an
+# opt-in profiler: "cprofile" or "sample" (stack sampling every N ms).
+METRICS_PORT = int(os.environ.get("AGRI_METRICS_PORT", 0))
+METRICS_FILE = os.environ.get("AGRI_METRICS_FILE", "")
+PROFILE_MODE = os.environ.get("AGRI_PROFILE", "")
+PROFILE_DIR = os.environ.get("AGRI_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get("AGRI_PROFILE_SAMPLE_INTERVAL_MS", 5))
@@ -0,0 +1,31 @@
+import streamlit as st
+import pandas as pd
+from utils.crop_recommendation import recommend_crops
+from utils.file_cache import file_fingerprint
+from utils.instrumentation import increment
+from utils.model_registry import CROP_MODEL_FILE
+from utils.recommendation_index import RECOMMENDATION_DATA_FILE
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def _recommendations(place, soil_type, land_size, versions):
+    # versions is only part of the cache key: new model or data files miss the cache
+    increment("recommendation_cache.misses")
+    return pd.DataFrame(recommend_crops(place, soil_type, land_size))
+
+def crop_recommendation_page():
+    st.title("🌾 Crop Recommendation")
+
+    # Inputs
+    soil_type = st.selectbox("Select Soil Type", ["Loamy", "Sandy", "Clay"])
+    land_size = st.number_input("Enter Land Size (in acres)", min_value=1.0)
+    place = st.selectbox("Select Place", ["North Karnataka", "South Karnataka"])
+
+    if st.button("Get Recommendations"):
+        versions = (file_fingerprint(CROP_MODEL_FILE), file_fingerprint(RECOMMENDATION_DATA_FILE))
+        df = _recommendations(place, soil_type, land_size, versions)
+
+        # Display recommendations
+        st.table(df)
+
+if __name__ == "__main__":
+    crop_recommendation_page()
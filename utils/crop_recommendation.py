@@ -1,6 +1,44 @@
-import pandas as pd
-import pickle
 import numpy as np
+import pandas as pd
+from utils.instrumentation import increment, span
+from utils.model_registry import get_crop_model
+from utils.recommendation_index import get_recommendation_index
+from utils.recommendation_table import get_recommendation_table
+
+# Define mappings
+SOIL_MAPPING = {
+    "Loamy": 0,
+    "Sandy": 1,
+    "Clay": 2,
+    "Silty": 3,
+    "Peaty": 4
+}
+
+REGION_MAPPING = {
+    "North Karnataka": 0,
+    "South Karnataka": 1
+}
+
+CROP_MAPPING = {
+    0: "Tomato",
+    1: "Onion",
+    2: "Chili",
+    3: "Cotton",
+    4: "Sugarcane",
+    5: "Corn"
+}
+
+def validate_farm(place, soil, land_area):
+    """
+    Raise ValueError if the inputs to recommend_crops are invalid.
+    """
+    if not isinstance(place, str) or place not in REGION_MAPPING:
+        raise ValueError("Invalid region. Choose from ['North Karnataka', 'South Karnataka']")
+    if not isinstance(soil, str) or soil not in SOIL_MAPPING:
+        raise ValueError(f"Invalid soil type. Choose from {list(SOIL_MAPPING.keys())}")
+    # bool is an int subclass, but true/false is not an area
+    if isinstance(land_area, bool) or not isinstance(land_area, (int, float)) or land_area <= 0:
+        raise ValueError("Land area must be a positive number")
 
 def recommend_crops(place, soil, land_area):
     """
@@ -12,88 +50,168 @@ def recommend_crops(place, soil, land_area):
     Output:
         List of 2-3 recommended crops with expected return and market demand level.
     """
-    # Define mappings
-    soil_mapping = {
-        "Loamy": 0,
-        "Sandy": 1,
-        "Clay": 2,
-        "Silty": 3,
-        "Peaty": 4
-    }
-
-    region_mapping = {
-        "North Karnataka": 0,
-        "South Karnataka": 1
-    }
-
-    crop_mapping = {
-        0: "Tomato",
-        1: "Onion",
-        2: "Chili",
-        3: "Cotton",
-        4: "Sugarcane",
-        5: "Corn"
-    }
+    validate_farm(place, soil, land_area)
 
-    # Validate inputs
-    if place not in region_mapping:
-        raise ValueError("Invalid region. Choose from ['North Karnataka', 'South Karnataka']")
-    if soil not in soil_mapping:
-        raise ValueError(f"Invalid soil type. Choose from {list(soil_mapping.keys())}")
-    if not isinstance(land_area, (int, float)) or land_area <= 0:
-        raise ValueError("Land area must be a positive number")
+    # Map inputs to numeric
+    soil_numeric = SOIL_MAPPING[soil]
+    region_numeric = REGION_MAPPING[place]
 
-    # Load the trained model
-    try:
-        with open("models/crop_model.pkl", "rb") as f:
-            model = pickle.load(f)
-    except FileNotFoundError:
-        raise FileNotFoundError("Model file 'models/crop_model.pkl' not found.")
+    # Precomputed model rankings; the model itself is only needed for inputs
+    # outside the table or when the table was built for another model
+    table = get_recommendation_table()
+    ranking = table.lookup(region_numeric, soil_numeric, land_area) if table is not None else None
+    if ranking is not None:
+        increment("recommendation_table.hits")
+        top_crop_indices = ranking[:3]
+    else:
+        increment("recommendation_table.misses")
+        # Load the trained model (shared across sessions, reloaded only on change)
+        model = get_crop_model()
 
-    # Map inputs to numeric
-    soil_numeric = soil_mapping[soil]
-    region_numeric = region_mapping[place]
-
-    # Predict crop probabilities
-    input_data = np.array([[soil_numeric, region_numeric, land_area]])
-    probas = model.predict_proba(input_data)[0]
-    top_crop_indices = np.argsort(probas)[-3:][::-1]  # Get top 3 crops
-    top_crops = [crop_mapping.get(idx, "Unknown") for idx in top_crop_indices]
-
-    # Load and filter historical data
-    try:
-        data = pd.read_csv('data/recommendation_data.csv')
-        data = data[data['region'].isin(["North Karnataka", "South Karnataka"])]
-    except FileNotFoundError:
-        raise FileNotFoundError("Data file 'data/recommendation_data.csv' not found.")
-
-    # Filter by region and top crops
-    filtered_data = data[
-        (data['region'] == place) &
-        (data['crop_type'].isin(top_crops))
-    ]
-
-    # If fewer than 2 crops, include all crops for the region as fallback
-    if len(filtered_data['crop_type'].unique()) < 2:
-        filtered_data = data[data['region'] == place]
-        top_crops = filtered_data['crop_type'].unique()[:3].tolist()
-
-    # Aggregate by crop type (mean return and demand score)
-    aggregated_data = filtered_data.groupby('crop_type').agg({
-        'expected_return_per_acre': 'mean',
-        'demand_score': 'mean'
-    }).reset_index()
-
-    # Filter to top crops if not fallback
-    if len(filtered_data['crop_type'].unique()) >= 2:
-        aggregated_data = aggregated_data[aggregated_data['crop_type'].isin(top_crops)]
+        # Predict crop probabilities
+        input_data = np.array([[soil_numeric, region_numeric, land_area]])
+        with span("inference.crop_predict_proba"):
+            probas = model.predict_proba(input_data)[0]
+        top_crop_indices = np.argsort(probas)[-3:][::-1]  # Get top 3 crops
+    top_crops = [CROP_MAPPING.get(idx, "Unknown") for idx in top_crop_indices]
+
+    # Per-(region, crop) aggregates, precomputed once per CSV version
+    index = get_recommendation_index()
+    candidates = [crop for crop in top_crops if index.lookup(place, crop) is not None]
+
+    # If fewer than 2 crops, fall back to the first crops seen for the region
+    if len(candidates) < 2:
+        candidates = index.crops_for(place)[:3]
 
     # Calculate expected return
-    aggregated_data['dynamic_expected_return'] = aggregated_data['expected_return_per_acre'] * land_area
+    rows = []
+    for crop in candidates:
+        mean_return, demand_score, _ = index.lookup(place, crop)
+        rows.append({
+            'crop_type': crop,
+            'dynamic_expected_return': float(mean_return * land_area),
+            'demand_score': float(demand_score)
+        })
 
     # Sort by return and demand, limit to 2-3 crops
-    recommended_crops = aggregated_data.sort_values(by=['dynamic_expected_return', 'demand_score'], ascending=False)
-    output = recommended_crops[['crop_type', 'dynamic_expected_return', 'demand_score']].head(3).to_dict(orient='records')
+    rows.sort(key=lambda row: (-row['dynamic_expected_return'], -row['demand_score'], row['crop_type']))
+    return rows[:3]
+
+
+def recommend_crops_batch(farms, top_k=3):
+    """
+    Vectorized crop recommendation for many farms at once.
+    Inputs:
+        farms (DataFrame or array-like): rows of (region, soil_type, land_size).
+            A DataFrame must have those column names; arrays use that column order.
+        top_k (int): Number of crops to return per farm.
+    Output:
+        DataFrame with one row per recommendation:
+        row, rank, crop_type, dynamic_expected_return, demand_score.
+    """
+    if top_k < 1:
+        raise ValueError("top_k must be at least 1")
+    if not isinstance(farms, pd.DataFrame):
+        farms = pd.DataFrame(np.asarray(farms, dtype=object).reshape(-1, 3),
+                             columns=["region", "soil_type", "land_size"])
+
+    # Validate inputs
+    region_codes = farms["region"].map(REGION_MAPPING)
+    soil_codes = farms["soil_type"].map(SOIL_MAPPING)
+    land_area = pd.to_numeric(farms["land_size"], errors="coerce").to_numpy(dtype=float)
+    if region_codes.isna().any():
+        raise ValueError(f"Invalid region in rows {list(np.flatnonzero(region_codes.isna()))}. "
+                         "Choose from ['North Karnataka', 'South Karnataka']")
+    if soil_codes.isna().any():
+        raise ValueError(f"Invalid soil type in rows {list(np.flatnonzero(soil_codes.isna()))}. "
+                         f"Choose from {list(SOIL_MAPPING.keys())}")
+    if np.isnan(land_area).any() or (land_area <= 0).any():
+        raise ValueError("Land area must be a positive number")
+    region_codes = region_codes.to_numpy(dtype=np.int64)
+    soil_codes = soil_codes.to_numpy(dtype=np.int64)
+
+    if len(farms) == 0:
+        return pd.DataFrame(columns=["row", "rank", "crop_type", "dynamic_expected_return", "demand_score"])
+
+    # Rankings from the precomputed table when it covers every row
+    table = get_recommendation_table()
+    rankings, covered = (table.lookup_many(region_codes, soil_codes, land_area) if table is not None
+                         else (None, np.zeros(len(farms), dtype=bool)))
+    if table is not None and covered.all():
+        increment("recommendation_table.hits", len(farms))
+        classes = table.classes_
+        k = min(top_k, rankings.shape[1])
+        top_crop_indices = rankings[:, :k]
+    else:
+        # One predict_proba call for the whole batch
+        increment("recommendation_table.misses", len(farms))
+        model = get_crop_model()
+        classes = model.classes_
+        input_data = np.column_stack([soil_codes, region_codes, land_area])
+        with span("inference.crop_predict_proba"):
+            probas = model.predict_proba(input_data)
+        k = min(top_k, probas.shape[1])
+        top_crop_indices = np.argsort(probas, axis=1)[:, -k:][:, ::-1]
+
+    # Dense aggregate tables over (region, crop)
+    index = get_recommendation_index()
+    regions = list(REGION_MAPPING)
+    crops = list(CROP_MAPPING.values())
+    for region in regions:
+        crops += [crop for crop in index.crops_for(region) if crop not in crops]
+    returns, demands, counts = index.as_arrays(regions, crops)
+    crop_codes = np.array([crops.index(CROP_MAPPING[cls]) if cls in CROP_MAPPING else -1
+                           for cls in classes])
+
+    candidates = crop_codes[top_crop_indices]
+    valid = (candidates >= 0) & (counts[region_codes[:, None], np.maximum(candidates, 0)] > 0)
+
+    # Rows with fewer than 2 known crops fall back to the region's first crops
+    fallback = np.full((len(regions), k), -1)
+    for i, region in enumerate(regions):
+        region_crops = [crops.index(crop) for crop in index.crops_for(region)[:k]]
+        fallback[i, :len(region_crops)] = region_crops
+    use_fallback = valid.sum(axis=1) < 2
+    candidates[use_fallback] = fallback[region_codes[use_fallback]]
+    valid[use_fallback] = candidates[use_fallback] >= 0
+
+    safe = np.maximum(candidates, 0)
+    dynamic_return = np.where(valid, returns[region_codes[:, None], safe] * land_area[:, None], -np.inf)
+    demand = np.where(valid, demands[region_codes[:, None], safe], -np.inf)
+
+    # Sort by return, then demand, then crop name (matches recommend_crops)
+    name_rank = np.argsort(np.argsort(crops))[safe]
+    order = np.lexsort((name_rank, -demand, -dynamic_return))
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    valid = np.take_along_axis(valid, order, axis=1)
+    dynamic_return = np.take_along_axis(dynamic_return, order, axis=1)
+    demand = np.take_along_axis(demand, order, axis=1)
+
+    rows, ranks = np.nonzero(valid)
+    return pd.DataFrame({
+        "row": farms.index.to_numpy()[rows],
+        "rank": ranks + 1,
+        "crop_type": np.array(crops, dtype=object)[candidates[rows, ranks]],
+        "dynamic_expected_return": dynamic_return[rows, ranks],
+        "demand_score": demand[rows, ranks],
+    })
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch crop recommendations for a CSV of farms.")
+    parser.add_argument("input", help="CSV with region, soil_type and land_size columns")
+    parser.add_argument("output", help="CSV file to write recommendations to")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
 
-    # Ensure at least 2 crops if available
-    return output if output else []
+    # Stream the input so files larger than memory can be processed
+    total = 0
+    reader = pd.read_csv(args.input, usecols=["region", "soil_type", "land_size"], chunksize=args.chunksize)
+    for i, chunk in enumerate(reader):
+        result = recommend_crops_batch(chunk, top_k=args.top_k)
+        result.to_csv(args.output, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        total += len(chunk)
+    print(f"✅ Wrote recommendations for {total} farms to {args.output}")
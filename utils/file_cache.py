@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+
+from utils.instrumentation import increment, span
+
+
+def file_fingerprint(path):
+    """
+    Cheap change marker for a file: (mtime in ns, size in bytes).
+    """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    increment("file_reads")
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileCache:
+    """
+    Process-wide cache of objects built from files on disk.
+
+    Each entry is loaded once and shared by every caller (and every Streamlit
+    session) in the process. The file's mtime/size is checked on each access;
+    when it changes, the contents are hashed and the entry is only rebuilt if
+    the hash differs too, so touching a file does not trigger a reload.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key):
+        with self._guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get(self, path, loader):
+        """
+        Return loader(path), reusing the cached value while the file is unchanged.
+        """
+        key = os.path.abspath(path)
+        try:
+            fingerprint = file_fingerprint(key)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File '{path}' not found.")
+
+        entry = self._entries.get(key)
+        if entry is not None and entry["fingerprint"] == fingerprint:
+            increment("file_cache.hits")
+            return entry["value"]
+
+        with self._lock_for(key):
+            # Another thread may have reloaded while we waited for the lock
+            entry = self._entries.get(key)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                return entry["value"]
+
+            with span("file_cache.digest"):
+                digest = file_digest(key)
+            if entry is not None and entry["digest"] == digest:
+                entry["fingerprint"] = fingerprint
+                increment("file_cache.hits")
+                return entry["value"]
+
+            increment("file_cache.loads")
+            value = loader(key)
+            self._entries[key] = {
+                "fingerprint": fingerprint,
+                "digest": digest,
+                "value": value,
+            }
+            return value
+
+    def version(self, path):
+        """
+        Content hash of the currently cached entry for path, or None.
+        """
+        entry = self._entries.get(os.path.abspath(path))
+        return entry["digest"] if entry is not None else None
+
+    def invalidate(self, path=None):
+        """
+        Drop one entry (or all entries when path is None).
+        """
+        with self._guard:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
@@ -0,0 +1,81 @@
+import numpy as np
+
+LEAF = -1
+
+
+class FlatForest:
+    """
+    A fitted sklearn forest classifier flattened into a handful of NumPy arrays.
+
+    All trees' nodes are concatenated into one set of arrays (feature,
+    threshold, left, right, value) and roots holds each tree's first node.
+    Prediction walks every row through every tree at once, one tree level per
+    step, so a batch costs max_depth vectorized steps and needs no sklearn.
+    Saved with joblib, the arrays are memory-mapped by the model registry.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == LEAF
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, LEAF, tree.children_left + offset))
+            rights.append(np.where(is_leaf, LEAF, tree.children_right + offset))
+            # Per-leaf class probabilities, as each tree's predict_proba returns them
+            value = tree.value[:, 0, :]
+            values.append(value / np.maximum(value.sum(axis=1, keepdims=True), 1e-12))
+            offset += tree.node_count
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values).astype(np.float32),
+            roots=np.array(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+        )
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.feature, self.threshold, self.left,
+                                              self.right, self.value, self.roots))
+
+    def predict_proba(self, X, batch_size=4096):
+        # sklearn compares float32 inputs against the thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if len(X) > batch_size:
+            # Smaller batches keep the walker arrays cache-resident
+            return np.concatenate([self.predict_proba(X[start:start + batch_size], batch_size)
+                                   for start in range(0, len(X), batch_size)])
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_X = X.ravel()
+
+        # One (row, tree) walker per entry; only walkers not yet at a leaf advance
+        nodes = np.tile(self.roots, n_rows)
+        offsets = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        active = np.flatnonzero(self.left[nodes] != LEAF)
+        while active.size:
+            current = nodes[active]
+            go_left = flat_X[offsets[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[self.left[current] != LEAF]
+        return self.value[nodes].reshape(n_rows, n_trees, -1).mean(axis=1, dtype=np.float64)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from utils.file_cache import file_fingerprint
+from utils.instrumentation import increment, span
+from utils.model_registry import PRICE_MODEL_FILE, get_price_model
+from utils.price_forecast import forecast_prices, load_price_history, price_data_version
+from utils.seasonal_index import seasonal_index_path, update_seasonal_index
+
+# Forecasts are precomputed for this many months; pages slice what they show
+MAX_HORIZON = 12
+REFRESH_INTERVAL_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+def _version(fingerprint):
+    mtime_ns, size = fingerprint
+    return f"{mtime_ns}-{size}"
+
+
+class ForecastCache:
+    """
+    LRU cache of price forecasts keyed by (crop, city, data version, model version).
+
+    A background thread refills it for every crop/city pair whenever
+    the price history (CSV or price store) or price_model.pkl changes, so page
+    views only read.
+    """
+
+    def __init__(self, max_entries=1024, data_file=None, model_file=PRICE_MODEL_FILE):
+        self.max_entries = max_entries
+        self.data_file = data_file
+        self.model_file = model_file
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._worker = None
+        self._history = None
+        self._seasonal_index = None
+        self._versions = None
+        self._last_refresh = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    def current_versions(self):
+        return _version(price_data_version(self.data_file)), _version(file_fingerprint(self.model_file))
+
+    def _put(self, key, forecast):
+        with self._lock:
+            self._entries[key] = forecast
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def refresh(self, force=False):
+        """
+        Recompute forecasts for every pair if the data or model changed.
+        Returns True when a refresh happened.
+        """
+        with self._refresh_lock:
+            versions = self.current_versions()
+            if not force and versions == self._versions:
+                return False
+
+            with span("forecast_cache.refresh"):
+                history = load_price_history(self.data_file)
+                seasonal_index = update_seasonal_index(history, versions[0], seasonal_index_path(self.data_file))
+                forecast = forecast_prices(history, get_price_model(), horizon=MAX_HORIZON,
+                                           seasonal_index=seasonal_index)
+                for (crop, city), group in forecast.groupby(["Crop", "City"], sort=False):
+                    self._put((crop, city) + versions, group.reset_index(drop=True))
+
+            self._history = history
+            self._seasonal_index = seasonal_index
+            self._versions = versions
+            self._last_refresh = time.time()
+            self.refreshes += 1
+            return True
+
+    def versions(self):
+        """
+        (data version, model version) the cached forecasts were computed for.
+        """
+        if self._versions is None:
+            self.refresh()
+        return self._versions
+
+    def history(self):
+        """
+        Price history the current forecasts were computed from.
+        """
+        if self._history is None:
+            self.refresh()
+        return self._history
+
+    def get(self, crop, city):
+        """
+        Forecast DataFrame for one pair (MAX_HORIZON months).
+        A miss computes the pair synchronously and stores it.
+        """
+        key = (crop, city) + self.versions()
+        with self._lock:
+            forecast = self._entries.get(key)
+            if forecast is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                increment("forecast_cache.hits")
+                return forecast
+            self.misses += 1
+            increment("forecast_cache.misses")
+
+        forecast = forecast_prices(self.history(), get_price_model(), pairs=[(crop, city)],
+                                   horizon=MAX_HORIZON, seasonal_index=self._seasonal_index)
+        self._put(key, forecast)
+        return forecast
+
+    def get_many(self, pairs):
+        """
+        Forecasts for many (crop, city) pairs. All misses are computed in one
+        forecast_prices call. Returns {pair: DataFrame}; pairs without price
+        history are left out.
+        """
+        versions = self.versions()
+        found, missing = {}, []
+        with self._lock:
+            for pair in dict.fromkeys(pairs):
+                forecast = self._entries.get(pair + versions)
+                if forecast is None:
+                    self.misses += 1
+                    missing.append(pair)
+                else:
+                    self._entries.move_to_end(pair + versions)
+                    self.hits += 1
+                    found[pair] = forecast
+        increment("forecast_cache.hits", len(found))
+        increment("forecast_cache.misses", len(missing))
+
+        if missing:
+            forecast = forecast_prices(self.history(), get_price_model(), pairs=missing,
+                                       horizon=MAX_HORIZON, seasonal_index=self._seasonal_index)
+            for pair, group in forecast.groupby(["Crop", "City"], sort=False):
+                group = group.reset_index(drop=True)
+                self._put(pair + versions, group)
+                found[pair] = group
+        return found
+
+    def _run(self, interval):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Forecast cache refresh failed")
+            time.sleep(interval)
+
+    def start_background_refresh(self, interval=REFRESH_INTERVAL_SECONDS):
+        """
+        Start the refresh thread once per process (later calls are no-ops).
+        """
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, args=(interval,),
+                                            name="forecast-cache-refresh", daemon=True)
+            self._worker.start()
+
+    def stats(self):
+        """
+        Hit/miss counters and how stale the cached forecasts are.
+        """
+        lookups = self.hits + self.misses
+        try:
+            stale = self._versions is None or self.current_versions() != self._versions
+        except FileNotFoundError:
+            stale = True
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "data_version": self._versions[0] if self._versions else None,
+            "model_version": self._versions[1] if self._versions else None,
+            "seconds_since_refresh": time.time() - self._last_refresh if self._last_refresh else None,
+            "stale": stale,
+        }
+
+
+forecast_cache = ForecastCache()
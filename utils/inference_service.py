@@ -0,0 +1,306 @@
+"""
+HTTP/JSON service for crop recommendations and price forecasts.
+
+Usage (from the repository root):
+    python -m utils.inference_service --workers 4 --port 8000
+
+Endpoints:
+    GET  /health
+    GET  /metrics          Prometheus text (see utils.instrumentation)
+    POST /recommend        {"place": "North Karnataka", "soil": "Loamy", "land_area": 2.5}
+    POST /recommend/batch  {"farms": [{"place": ..., "soil": ..., "land_area": ...}], "top_k": 3}
+    GET  /forecast?crop=Tomato&city=Bangalore&horizon=5
+    POST /forecast/batch   {"pairs": [{"crop": ..., "city": ...}], "horizon": 5}
+
+Single /recommend and /forecast requests are micro-batched: requests that
+arrive while a batch is being collected or computed are answered by one
+predict_proba / forecast call. Settings live in utils.config (AGRI_SERVICE_*).
+"""
+import asyncio
+import contextlib
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from utils import config
+from utils.crop_recommendation import recommend_crops_batch, validate_farm
+from utils.forecast_cache import MAX_HORIZON, forecast_cache
+from utils.instrumentation import increment, prometheus_text, span
+from utils.model_registry import CROP_MODEL_FILE, get_crop_model, get_price_model, model_version
+from utils.recommendation_index import get_recommendation_index
+
+FARM_COLUMNS = ["region", "soil_type", "land_size"]
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent requests and runs handler once per
+    batch in a worker thread. handler takes a list of items and returns one
+    result per item, in order.
+    """
+
+    def __init__(self, name, handler, max_batch_size=config.SERVICE_MAX_BATCH_SIZE,
+                 max_wait_ms=config.SERVICE_MAX_WAIT_MS):
+        self.name = name
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever queued up while the previous batch was computing
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            increment(f"service.{self.name}.batches")
+            increment(f"service.{self.name}.items", len(items))
+            try:
+                with span(f"service.{self.name}.batch"):
+                    results = await asyncio.get_running_loop().run_in_executor(None, self.handler, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.batches += 1
+            self.items += len(batch)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def _recommendation_rows(result, n_farms):
+    """
+    Split recommend_crops_batch output into one list of dicts per farm.
+    """
+    rows = [[] for _ in range(n_farms)]
+    for row, crop, expected_return, demand in zip(result["row"], result["crop_type"],
+                                                  result["dynamic_expected_return"],
+                                                  result["demand_score"]):
+        rows[row].append({
+            "crop_type": crop,
+            "dynamic_expected_return": float(expected_return),
+            "demand_score": float(demand),
+        })
+    return rows
+
+
+def _recommend_many(farms, top_k=3):
+    # One predict_proba call for every farm in the batch
+    result = recommend_crops_batch(pd.DataFrame(farms, columns=FARM_COLUMNS), top_k=top_k)
+    return _recommendation_rows(result, len(farms))
+
+
+def _forecast_many(pairs):
+    # Cached pairs are looked up; all misses share one forecast_prices call
+    forecasts = forecast_cache.get_many(pairs)
+    return [forecasts.get(pair) for pair in pairs]
+
+
+recommend_batcher = MicroBatcher("recommend", _recommend_many)
+forecast_batcher = MicroBatcher("forecast", _forecast_many)
+
+
+def _error(message, status_code=400):
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ValueError("Request body must be JSON")
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+    return body
+
+
+def _farm(item):
+    farm = (item.get("place"), item.get("soil"), item.get("land_area"))
+    validate_farm(*farm)
+    return farm
+
+
+def _pair(item):
+    if not isinstance(item, dict):
+        raise ValueError('Each pair must be an object with "crop" and "city"')
+    pair = (item.get("crop"), item.get("city"))
+    if not all(isinstance(value, str) and value for value in pair):
+        raise ValueError("crop and city must be non-empty strings")
+    return pair
+
+
+def _horizon(value):
+    horizon = int(value)
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon must be between 1 and {MAX_HORIZON}")
+    return horizon
+
+
+def _check_crop(crop):
+    known = get_price_model()["historical_stats"]["Crop"]
+    if crop not in set(known):
+        raise ValueError(f"Unknown crop '{crop}'. Choose from {sorted(known)}")
+
+
+def _forecast_json(crop, city, forecast, horizon):
+    forecast = forecast.head(horizon)
+    return {
+        "crop": crop,
+        "city": city,
+        "forecast": [{"date": date.strftime("%Y-%m-%d"), "price": float(price)}
+                     for date, price in zip(forecast["Date"], forecast["Predicted Price"])],
+    }
+
+
+async def health(request):
+    return JSONResponse({
+        "status": "ok",
+        "crop_model_version": model_version(CROP_MODEL_FILE),
+        "forecast_cache": forecast_cache.stats(),
+        "recommend_batches": recommend_batcher.stats(),
+        "forecast_batches": forecast_batcher.stats(),
+    })
+
+
+async def metrics(request):
+    return PlainTextResponse(prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+async def recommend(request):
+    try:
+        farm = _farm(await _json_body(request))
+    except ValueError as e:
+        return _error(str(e))
+    return JSONResponse({"recommendations": await recommend_batcher.submit(farm)})
+
+
+async def recommend_batch(request):
+    try:
+        body = await _json_body(request)
+        farms = [_farm(item) for item in body.get("farms", [])]
+        top_k = int(body.get("top_k", 3))
+    except (ValueError, TypeError, AttributeError) as e:
+        return _error(str(e))
+    if not farms:
+        return _error("farms must be a non-empty list")
+    if top_k < 1:
+        return _error("top_k must be at least 1")
+    rows = await asyncio.get_running_loop().run_in_executor(None, _recommend_many, farms, top_k)
+    return JSONResponse({"results": [{"recommendations": recs} for recs in rows]})
+
+
+async def forecast(request):
+    crop, city = request.query_params.get("crop"), request.query_params.get("city")
+    try:
+        if not crop or not city:
+            raise ValueError("crop and city are required")
+        horizon = _horizon(request.query_params.get("horizon", 5))
+        _check_crop(crop)
+    except ValueError as e:
+        return _error(str(e))
+    result = await forecast_batcher.submit((crop, city))
+    if result is None:
+        return _error(f"No price history for {crop} in {city}", 404)
+    return JSONResponse(_forecast_json(crop, city, result, horizon))
+
+
+async def forecast_batch(request):
+    try:
+        body = await _json_body(request)
+        items = body.get("pairs", [])
+        if not isinstance(items, list):
+            raise ValueError("pairs must be a list")
+        pairs = [_pair(item) for item in items]
+        horizon = _horizon(body.get("horizon", 5))
+        for crop in {crop for crop, _ in pairs}:
+            _check_crop(crop)
+    except (ValueError, TypeError) as e:
+        return _error(str(e))
+    results = await asyncio.get_running_loop().run_in_executor(None, _forecast_many, pairs)
+    return JSONResponse({"results": [
+        {"crop": crop, "city": city, "error": "No price history"} if result is None
+        else _forecast_json(crop, city, result, horizon)
+        for (crop, city), result in zip(pairs, results)
+    ]})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load the shared model set before the first request
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, get_crop_model)
+    await loop.run_in_executor(None, get_recommendation_index)
+    await loop.run_in_executor(None, forecast_cache.refresh)
+    forecast_cache.start_background_refresh()
+    yield
+    await recommend_batcher.close()
+    await forecast_batcher.close()
+
+
+app = Starlette(routes=[
+    Route("/health", health),
+    Route("/metrics", metrics),
+    Route("/recommend", recommend, methods=["POST"]),
+    Route("/recommend/batch", recommend_batch, methods=["POST"]),
+    Route("/forecast", forecast),
+    Route("/forecast/batch", forecast_batch, methods=["POST"]),
+], lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve recommendations and forecasts over HTTP.")
+    parser.add_argument("--host", default=config.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVICE_WORKERS,
+                        help="worker processes (one per core is a good start)")
+    args = parser.parse_args()
+
+    uvicorn.run("utils.inference_service:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,240 @@
+"""
+Lightweight timing spans, counters and opt-in profiling.
+
+    with span("inference.crop_predict_proba"):
+        probas = model.predict_proba(X)
+    increment("file_cache.hits")
+
+Spans and counters are aggregated in memory per process and cost a
+perf_counter call and a dict update. They can be exported as:
+    - Prometheus text and JSON from a small HTTP endpoint (AGRI_METRICS_PORT,
+      or the inference service's /metrics route)
+    - one JSON line per finished span (AGRI_METRICS_FILE)
+
+AGRI_PROFILE=cprofile or AGRI_PROFILE=sample turns on profile() blocks, which
+write .prof files (cProfile) or collapsed stacks for flame graphs (sampling)
+to AGRI_PROFILE_DIR.
+"""
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils import config
+
+# Upper bounds (seconds) of the span latency histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_spans = {}
+_counters = Counter()
+_events_file = None
+_server = None
+
+
+def record(name, seconds):
+    """
+    Add one timing of seconds to the span name.
+    """
+    global _events_file
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+        stats["count"] += 1
+        stats["sum"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stats["buckets"][i] += 1
+                break
+
+        if config.METRICS_FILE:
+            if _events_file is None:
+                _events_file = open(config.METRICS_FILE, "a", buffering=1)
+            _events_file.write(json.dumps({
+                "ts": time.time(), "span": name, "ms": round(1000 * seconds, 3),
+                "thread": threading.current_thread().name,
+            }) + "\n")
+
+
+@contextmanager
+def span(name):
+    """
+    Time the enclosed block under name (e.g. "data_load.price_history").
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def increment(name, amount=1):
+    """
+    Add amount to the counter name (e.g. "file_cache.hits").
+    """
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot():
+    """
+    Current span statistics and counters as plain data.
+    """
+    with _lock:
+        spans = {
+            name: {
+                "count": stats["count"],
+                "total_ms": round(1000 * stats["sum"], 3),
+                "mean_ms": round(1000 * stats["sum"] / stats["count"], 3),
+                "max_ms": round(1000 * stats["max"], 3),
+            }
+            for name, stats in _spans.items()
+        }
+        return {"spans": spans, "counters": dict(_counters)}
+
+
+def prometheus_text():
+    """
+    Spans as a histogram and counters in the Prometheus text format.
+    """
+    with _lock:
+        spans = {name: dict(stats, buckets=list(stats["buckets"])) for name, stats in _spans.items()}
+        counters = dict(_counters)
+
+    lines = ["# HELP agri_span_seconds Time spent in instrumented spans.",
+             "# TYPE agri_span_seconds histogram"]
+    for name, stats in sorted(spans.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, stats["buckets"]):
+            cumulative += count
+            lines.append(f'agri_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'agri_span_seconds_bucket{{span="{name}",le="+Inf"}} {stats["count"]}')
+        lines.append(f'agri_span_seconds_sum{{span="{name}"}} {stats["sum"]:.6f}')
+        lines.append(f'agri_span_seconds_count{{span="{name}"}} {stats["count"]}')
+
+    lines += ["# HELP agri_events_total Instrumentation counters.",
+              "# TYPE agri_events_total counter"]
+    for name, value in sorted(counters.items()):
+        lines.append(f'agri_events_total{{name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = prometheus_text(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(snapshot()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json from a daemon thread.
+    Does nothing when no port is configured; later calls are no-ops.
+    """
+    global _server
+    port = config.METRICS_PORT if port is None else port
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+
+class _Sampler:
+    """
+    Sampling profiler: records the stack of the profiled thread every
+    interval seconds as collapsed "frame;frame;frame count" lines.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile(name):
+    """
+    Profile the enclosed block when AGRI_PROFILE is "cprofile" or "sample";
+    otherwise a no-op. Output goes to AGRI_PROFILE_DIR/<name>-<timestamp>.
+    """
+    mode = config.PROFILE_MODE
+    if mode not in ("cprofile", "sample"):
+        yield
+        return
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(config.PROFILE_DIR, f"{name.replace(' ', '_')}-{time.time_ns()}")
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another session's profile() is running; only one can be active
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{stem}.prof")
+    else:
+        sampler = _Sampler(threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.dump(f"{stem}.folded")
@@ -1,14 +1,53 @@
 import streamlit as st
 import pandas as pd
-
-MARKETPLACE_FILE = "data/marketplace_data.csv"
+from utils.instrumentation import span
+from utils.marketplace_store import DISPLAY_COLUMNS, get_marketplace_store
+from utils.matching import load_open_requirements, match_farmers
 
 def marketplace_page():
     st.title("🛒 Marketplace")
+    store = get_marketplace_store()
+
+    # Filters
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        crop_filter = st.selectbox("Crop", ["All"] + store.crops())
+    with col2:
+        min_price = st.number_input("Minimum Price (₹/kg)", min_value=0.0, value=0.0)
+    with col3:
+        sort_by = st.selectbox("Sort by", ["Deadline", "Price"])
+
+    # Reset pagination whenever the filters change
+    filters = (crop_filter, min_price, sort_by)
+    if st.session_state.get("marketplace_filters") != filters:
+        st.session_state.marketplace_filters = filters
+        st.session_state.marketplace_cursors = [None]
 
-    # Load marketplace data
-    df = pd.read_csv(MARKETPLACE_FILE)
-    st.dataframe(df)
+    # Load only the visible page of requirements
+    cursors = st.session_state.marketplace_cursors
+    with span("data_load.marketplace_query"):
+        rows, next_cursor = store.query(
+            crop=None if crop_filter == "All" else crop_filter,
+            min_price=min_price or None,
+            order_by=sort_by.lower(),
+            descending=sort_by == "Price",
+            cursor=cursors[-1],
+        )
+    df = pd.DataFrame(rows, columns=list(DISPLAY_COLUMNS)).rename(columns=DISPLAY_COLUMNS)
+    with span("render.marketplace_table"):
+        st.dataframe(df)
+
+    prev_col, page_col, next_col = st.columns(3)
+    with prev_col:
+        if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with page_col:
+        st.write(f"Page {len(cursors)}")
+    with next_col:
+        if st.button("Next ➡️", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
 
     if st.session_state.role == "company":
         st.subheader("Post a Requirement")
@@ -20,10 +59,20 @@ def marketplace_page():
         contact = st.text_input("Contact Info")
 
         if st.button("Submit"):
-            new_entry = pd.DataFrame([[company, crop, quantity, price, deadline, contact]],
-                                     columns=df.columns)
-            df = pd.concat([df, new_entry], ignore_index=True)
-            df.to_csv(MARKETPLACE_FILE, index=False)
+            store.add_requirement(company, crop, quantity, price, deadline, contact)
             st.success("Requirement posted successfully!")
     else:
         st.error("Only companies can post requirements.")
+
+        st.subheader("Find Buyers for Your Crop")
+        crop = st.selectbox("Your Crop", store.crops())
+        expected_yield = st.number_input("Expected Yield (kg)", min_value=1.0, value=1000.0)
+        if crop and st.button("Find Buyers"):
+            farmer = pd.DataFrame([["me", crop, expected_yield]],
+                                  columns=["farmer_id", "crop_type", "expected_yield"])
+            with span("inference.match_farmers"):
+                matches = match_farmers(farmer, load_open_requirements(store, crop=crop))
+            if matches.empty:
+                st.info("No open requirements you can fill right now.")
+            else:
+                st.table(matches.drop(columns=["farmer_id", "crop_type"]))
@@ -0,0 +1,194 @@
+import base64
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from utils import config
+
+# Store column -> column header used in marketplace_data.csv and on the page
+DISPLAY_COLUMNS = {
+    "company": "Company",
+    "crop": "Crop",
+    "quantity": "Quantity (kg)",
+    "price": "Price (₹/kg)",
+    "deadline": "Deadline",
+    "contact": "Contact",
+}
+
+SORT_COLUMNS = ("deadline", "price", "id")
+
+
+def _encode_cursor(value, row_id):
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return value, row_id
+
+
+class MarketplaceStore:
+    """
+    Append-only SQLite store of company requirements.
+
+    Postings are single-row inserts (WAL mode, so concurrent posts from several
+    workers never overwrite each other) and are indexed by crop, deadline and
+    price. Queries use keyset pagination: each page carries a cursor with the
+    last (sort value, id) seen, so fetching a page costs the same however deep
+    into the results it is.
+    """
+
+    def __init__(self, path=config.MARKETPLACE_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS requirements ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, company TEXT, crop TEXT NOT NULL, "
+                "quantity REAL NOT NULL, price REAL NOT NULL, deadline TEXT NOT NULL, "
+                "contact TEXT, posted_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS requirements_crop_deadline "
+                         "ON requirements (crop, deadline, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS requirements_crop_price "
+                         "ON requirements (crop, price, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS requirements_deadline ON requirements (deadline, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS requirements_price ON requirements (price, id)")
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add_requirement(self, company, crop, quantity, price, deadline, contact):
+        """
+        Append one posting and return its id.
+        """
+        if isinstance(deadline, (date, datetime)):
+            deadline = deadline.isoformat()[:10]
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO requirements (company, crop, quantity, price, deadline, contact, posted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (company, crop, quantity, price, deadline, contact, datetime.now().isoformat()),
+            )
+            return cur.lastrowid
+
+    def import_rows(self, rows, only_if_empty=False):
+        """
+        Bulk-append (company, crop, quantity, price, deadline, contact) rows.
+        With only_if_empty, nothing is written if the store already has postings
+        (checked in the same write transaction). Returns the number of rows added.
+        """
+        posted_at = datetime.now().isoformat()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if only_if_empty and conn.execute("SELECT 1 FROM requirements LIMIT 1").fetchone():
+                conn.rollback()
+                return 0
+            conn.executemany(
+                "INSERT INTO requirements (company, crop, quantity, price, deadline, contact, posted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [tuple(row) + (posted_at,) for row in rows],
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+
+    def crops(self):
+        rows = self._connect().execute("SELECT DISTINCT crop FROM requirements ORDER BY crop")
+        return [row["crop"] for row in rows]
+
+    def query(self, crop=None, min_price=None, max_price=None, deadline_from=None,
+              deadline_to=None, order_by="deadline", descending=False, limit=None, cursor=None):
+        """
+        Filtered, sorted page of requirements.
+
+        Returns (rows, next_cursor); rows are dicts keyed by store column and
+        next_cursor is None on the last page. Pass next_cursor back unchanged
+        to fetch the following page.
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Invalid sort column. Choose from {list(SORT_COLUMNS)}")
+        limit = limit or config.MARKETPLACE_PAGE_SIZE
+
+        clauses, params = [], []
+        if crop is not None:
+            clauses.append("crop = ?")
+            params.append(crop)
+        if min_price is not None:
+            clauses.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price <= ?")
+            params.append(max_price)
+        if deadline_from is not None:
+            clauses.append("deadline >= ?")
+            params.append(str(deadline_from))
+        if deadline_to is not None:
+            clauses.append("deadline <= ?")
+            params.append(str(deadline_to))
+        if cursor is not None:
+            value, row_id = _decode_cursor(cursor)
+            clauses.append(f"({order_by}, id) {'<' if descending else '>'} (?, ?)")
+            params += [value, row_id]
+
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT * FROM requirements"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} {direction}, id {direction} LIMIT ?"
+        # Fetch one extra row to know whether another page exists
+        rows = [dict(row) for row in self._connect().execute(sql, params + [limit + 1])]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][order_by], rows[-1]["id"])
+        return rows, next_cursor
+
+
+def migrate_csv_to_sqlite(csv_file=config.MARKETPLACE_FILE, db_file=config.MARKETPLACE_DB_FILE):
+    """
+    One-shot copy of marketplace_data.csv into the store. Does nothing if the
+    store already has postings. Returns the number of rows copied.
+    """
+    store = MarketplaceStore(db_file)
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = [[row[header] for header in DISPLAY_COLUMNS.values()] for row in csv.DictReader(f)]
+    return store.import_rows(rows, only_if_empty=True)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_marketplace_store():
+    """
+    Process-wide marketplace store, seeded from the CSV the first time it is created.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            first_run = not os.path.exists(config.MARKETPLACE_DB_FILE)
+            _store = MarketplaceStore(config.MARKETPLACE_DB_FILE)
+            if first_run and os.path.exists(config.MARKETPLACE_FILE):
+                migrate_csv_to_sqlite(config.MARKETPLACE_FILE, config.MARKETPLACE_DB_FILE)
+        return _store
+
+
+if __name__ == "__main__":
+    count = migrate_csv_to_sqlite()
+    print(f"✅ Migrated {count} requirements from {config.MARKETPLACE_FILE} to {config.MARKETPLACE_DB_FILE}")
@@ -0,0 +1,164 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from utils.marketplace_store import get_marketplace_store
+
+
+def _crop_key(crop):
+    return str(crop).strip().lower()
+
+
+def load_open_requirements(store=None, crop=None, today=None, page_size=10_000):
+    """
+    All requirements (optionally for one crop) whose deadline has not passed.
+    """
+    store = store or get_marketplace_store()
+    today = (today or date.today()).isoformat()
+    rows, cursor = [], None
+    while True:
+        page, cursor = store.query(crop=crop, deadline_from=today, order_by="id",
+                                   limit=page_size, cursor=cursor)
+        rows += page
+        if cursor is None:
+            break
+    return pd.DataFrame(rows, columns=["id", "company", "crop", "quantity", "price", "deadline", "contact"])
+
+
+def _min_table(quantities):
+    """
+    Sparse table of range minimums: level l holds min(quantities[i:i + 2**l])
+    for every window that fits.
+    """
+    levels = [quantities]
+    width = 1
+    while 2 * width <= len(quantities):
+        previous = levels[-1]
+        levels.append(np.minimum(previous[:-width], previous[width:]))
+        width *= 2
+    return levels
+
+
+def _next_fit(levels, start, yields):
+    """
+    For each yield, the first position at or after start whose quantity fits
+    (-1 if none). Windows that are too large for the yield are skipped from
+    the widest down, which is a binary search over the skipped length.
+    """
+    n = len(levels[0])
+    position = start.copy()
+    for level in range(len(levels) - 1, -1, -1):
+        window = levels[level]
+        inside = position < len(window)
+        too_large = inside & (window[np.minimum(position, len(window) - 1)] > yields)
+        position += np.where(too_large, 1 << level, 0)
+    return np.where(position < n, position, -1)
+
+
+class RequirementIndex:
+    """
+    Open requirements grouped by crop, each group pre-sorted best-first
+    (highest price, then earliest deadline). Each group also keeps a sparse
+    table of range-minimum quantities, so finding a farmer's next requirement
+    that fits is a binary search: matching costs O(top_k * log n) per farmer
+    instead of a scan over the crop's n requirements.
+    """
+
+    def __init__(self, requirements):
+        requirements = requirements.assign(crop_key=requirements["crop"].map(_crop_key))
+        requirements = requirements.sort_values(["price", "deadline", "id"],
+                                                ascending=[False, True, True], kind="stable")
+        self.by_crop = {
+            crop: group.reset_index(drop=True)
+            for crop, group in requirements.groupby("crop_key", sort=False)
+        }
+        self._min_tables = {}
+
+    def match(self, yields, crop, top_k=5, require_full=True):
+        """
+        Best top_k requirement positions for each yield, shape (len(yields), top_k).
+        -1 marks missing matches.
+        """
+        key = _crop_key(crop)
+        group = self.by_crop.get(key)
+        positions = np.full((len(yields), top_k), -1)
+        if group is None:
+            return None, positions
+
+        n = len(group)
+        if not require_full:
+            k = min(top_k, n)
+            positions[:, :k] = np.arange(k)
+            return group, positions
+
+        levels = self._min_tables.get(key)
+        if levels is None:
+            levels = self._min_tables[key] = _min_table(group["quantity"].to_numpy(dtype=float))
+        # Requirements each farmer can fill, in ranked order
+        start = np.zeros(len(yields), dtype=np.int64)
+        for j in range(top_k):
+            found = _next_fit(levels, start, yields)
+            positions[:, j] = found
+            start = np.where(found >= 0, found + 1, n)
+        return group, positions
+
+
+def match_farmers(farmers, requirements=None, top_k=5, require_full=True):
+    """
+    Rank open marketplace requirements for many farmers in one batched job.
+    Inputs:
+        farmers (DataFrame): farmer_id, crop_type and expected_yield (kg) columns,
+            one row per recommended crop (e.g. from recommend_crops_batch).
+        requirements (DataFrame): Open requirements; loaded from the store if None.
+        top_k (int): Matches to return per farmer and crop.
+        require_full (bool): Only match requirements the yield can fully cover.
+    Output:
+        DataFrame with one row per match, ranked by price and then deadline.
+    """
+    if requirements is None:
+        requirements = load_open_requirements()
+    index = RequirementIndex(requirements)
+
+    results = []
+    for crop, group in farmers.groupby(farmers["crop_type"].map(_crop_key), sort=False):
+        yields = group["expected_yield"].to_numpy(dtype=float)
+        matches, positions = index.match(yields, crop, top_k, require_full)
+        if matches is None:
+            continue
+        rows, ranks = np.nonzero(positions >= 0)
+        picked = matches.iloc[positions[rows, ranks]].reset_index(drop=True)
+        results.append(pd.DataFrame({
+            "farmer_id": group["farmer_id"].to_numpy()[rows],
+            "crop_type": group["crop_type"].to_numpy()[rows],
+            "rank": ranks + 1,
+            "requirement_id": picked["id"],
+            "company": picked["company"],
+            "price": picked["price"],
+            "quantity": picked["quantity"],
+            "deadline": picked["deadline"],
+            "contact": picked["contact"],
+            "expected_revenue": picked["price"] * np.minimum(picked["quantity"], yields[rows]),
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=["farmer_id", "crop_type", "rank", "requirement_id", "company",
+                                     "price", "quantity", "deadline", "contact", "expected_revenue"])
+    return pd.concat(results, ignore_index=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Match farmers to open marketplace requirements.")
+    parser.add_argument("input", help="CSV with farmer_id, crop_type and expected_yield columns")
+    parser.add_argument("output", help="CSV file to write matches to")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--allow-partial", action="store_true",
+                        help="also match requirements larger than the farmer's yield")
+    args = parser.parse_args()
+
+    farmers = pd.read_csv(args.input, usecols=["farmer_id", "crop_type", "expected_yield"])
+    matches = match_farmers(farmers, top_k=args.top_k, require_full=not args.allow_partial)
+    matches.to_csv(args.output, index=False)
+    print(f"✅ Wrote {len(matches)} matches for {farmers['farmer_id'].nunique()} farmers to {args.output}")
@@ -0,0 +1,75 @@
+import os
+import pickle
+import sys
+
+import joblib
+
+from utils.file_cache import FileCache
+from utils.instrumentation import increment, span
+from utils.price_forecast import validate_price_artifact
+
+CROP_MODEL_FILE = "models/crop_model.pkl"
+PRICE_MODEL_FILE = "models/price_model.pkl"
+
+_models = FileCache()
+
+
+def _load_artifact(path):
+    # joblib reads both plain pickles and joblib dumps. For joblib dumps the
+    # numpy buffers are memory-mapped read-only, so every worker process maps
+    # the same pages from the OS page cache instead of holding its own copy.
+    increment("file_reads")
+    with span("model_load"):
+        return joblib.load(path, mmap_mode="r")
+
+
+def _load_price_artifact(path):
+    return validate_price_artifact(_load_artifact(path))
+
+
+def load_model(path, loader=_load_artifact):
+    """
+    Load a model artifact once per process and reuse it until the file changes.
+    """
+    return _models.get(path, loader)
+
+
+def model_version(path):
+    """
+    Content hash of the loaded artifact at path (None if not loaded yet).
+    """
+    return _models.version(path)
+
+
+def get_crop_model():
+    return load_model(CROP_MODEL_FILE)
+
+
+def get_price_model():
+    return load_model(PRICE_MODEL_FILE, _load_price_artifact)
+
+
+def reload_models():
+    """
+    Forget every cached artifact; the next access loads from disk again.
+    """
+    _models.invalidate()
+
+
+def convert_to_joblib(path):
+    """
+    Rewrite a plain pickle as an uncompressed joblib dump (mmap-friendly).
+    The file is replaced atomically so running processes never see a partial file.
+    """
+    with open(path, "rb") as f:
+        obj = pickle.load(f)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    # Usage: python -m utils.model_registry [model.pkl ...]
+    for artifact in sys.argv[1:] or [CROP_MODEL_FILE, PRICE_MODEL_FILE]:
+        convert_to_joblib(artifact)
+        print(f"✅ Converted {artifact} to joblib format")
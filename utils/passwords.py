@@ -0,0 +1,65 @@
+import base64
+import hashlib
+import hmac
+import os
+
+from utils import config
+from utils.instrumentation import span
+
+SALT_BYTES = 16
+SCRYPT_R = 8
+SCRYPT_P = 1
+ALGORITHMS = ("scrypt", "pbkdf2_sha256")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive(password, algorithm, cost, salt):
+    if algorithm == "scrypt":
+        n = 2 ** cost
+        with span("auth.scrypt"):
+            return hashlib.scrypt(password.encode(), salt=salt, n=n, r=SCRYPT_R, p=SCRYPT_P,
+                                  maxmem=256 * SCRYPT_R * n, dklen=32)
+    if algorithm == "pbkdf2_sha256":
+        with span("auth.pbkdf2_sha256"):
+            return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, cost)
+    raise ValueError(f"Unknown password hash algorithm '{algorithm}'. Choose from {list(ALGORITHMS)}")
+
+
+def hash_password(password, algorithm=None, cost=None):
+    """
+    Salted hash of password, encoded as "algorithm$cost$salt$hash".
+    Defaults to the algorithm and cost in utils.config.
+    """
+    algorithm = algorithm or config.PASSWORD_HASH_ALGORITHM
+    cost = cost or config.PASSWORD_HASH_COST
+    salt = os.urandom(SALT_BYTES)
+    return f"{algorithm}${cost}${_b64(salt)}${_b64(_derive(password, algorithm, cost, salt))}"
+
+
+def is_hashed(stored):
+    return stored.split("$", 1)[0] in ALGORITHMS and stored.count("$") == 3
+
+
+def verify_password(password, stored):
+    """
+    Check password against a stored hash. Rows that predate hashing hold the
+    plaintext password and are compared directly.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    algorithm, cost, salt, expected = stored.split("$")
+    actual = _derive(password, algorithm, int(cost), base64.b64decode(salt))
+    return hmac.compare_digest(actual, base64.b64decode(expected))
+
+
+def needs_rehash(stored):
+    """
+    True for plaintext rows and hashes made with a different algorithm or cost.
+    """
+    if not is_hashed(stored):
+        return True
+    algorithm, cost, _, _ = stored.split("$")
+    return algorithm != config.PASSWORD_HASH_ALGORITHM or int(cost) != config.PASSWORD_HASH_COST
@@ -0,0 +1,228 @@
+"""
+Rolling-origin backtest of the price forecast.
+
+For each origin month the forecaster sees only the history up to the end of
+that month (forecast_prices(start_date=origin), the same code path the app
+uses), and its predictions for the following months are compared with the
+mean price actually observed in them. Errors are reported as MAPE and RMSE
+per forecast step, overall or per crop. Each prediction is scored unclipped
+and clipped to every requested bounds, so the effect of the historical-range
+clip can be read off directly.
+
+Origins are spread over a process pool; every worker loads the price history
+and the memory-mapped model once. Results are cached per (model file, price
+history, settings) in models/price_backtests/, so rerunning for an unchanged
+model is a file read.
+
+Usage (from the repository root):
+    python -m utils.price_backtest
+    python -m utils.price_backtest --horizon 12 --clip 0.85,1.15 --clip 0.7,1.3 --workers 8
+
+The model's per-crop statistics and trend are fitted on the full history, so
+errors for origins inside the training window are somewhat optimistic.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.file_cache import file_digest
+from utils.instrumentation import span
+from utils.model_registry import PRICE_MODEL_FILE, get_price_model
+from utils.price_forecast import CLIP_BOUNDS, forecast_prices, load_price_history, price_data_version
+
+BACKTEST_DIR = "models/price_backtests"
+DEFAULT_HORIZON = 6
+# Observations a pair needs up to an origin before it is forecast from there
+MIN_HISTORY = 3
+SUM_COLUMNS = ["n", "abs_pct", "sq"]
+
+# Per-worker state, set by _init_worker
+_history = None
+_actuals = None
+
+
+def clip_label(bounds):
+    return "none" if bounds is None else f"{bounds[0]:g}-{bounds[1]:g}"
+
+
+def monthly_actuals(history):
+    """
+    Mean observed price per (Crop, City, month).
+    """
+    month = history["Date"].dt.to_period("M").rename("Month")
+    return history.groupby(["Crop", "City", month])["Modal Price"].mean()
+
+
+def origins(history, min_history=MIN_HISTORY, every=1):
+    """
+    Month-end origins with at least min_history months before them (inclusive)
+    and at least one month after, every `every` months.
+    """
+    months = np.sort(history["Date"].dt.to_period("M").unique())
+    candidates = months[min_history - 1:-1:every]
+    return [month.end_time.normalize() for month in candidates]
+
+
+def _init_worker(data_path):
+    global _history, _actuals
+    _history = load_price_history(data_path)
+    _actuals = monthly_actuals(_history)
+
+
+def evaluate_origin(origin, horizon, clips, min_history=MIN_HISTORY):
+    """
+    Error sums (n, sum of |error| / actual, sum of squared errors) per
+    (Clip, Crop, Step) for forecasts made at origin.
+    """
+    model = get_price_model()
+    past = _history[_history["Date"] <= origin]
+    stats = past.groupby(["Crop", "City"], sort=False)["Modal Price"].agg(["count", "min", "max"])
+    known = stats.index.get_level_values("Crop").isin(model["historical_stats"]["Crop"])
+    stats = stats[known & (stats["count"] >= min_history).to_numpy()]
+    if stats.empty:
+        return None
+
+    with span("backtest.forecast"):
+        forecast = forecast_prices(_history, model, pairs=list(stats.index), horizon=horizon,
+                                   start_date=origin, clip_bounds=None)
+
+    pairs = pd.MultiIndex.from_arrays([forecast["Crop"], forecast["City"]])
+    months = forecast["Date"].dt.to_period("M")
+    actual = _actuals.reindex(pd.MultiIndex.from_arrays([forecast["Crop"], forecast["City"], months])).to_numpy()
+    scored = actual > 0
+    if not scored.any():
+        return None
+    actual = actual[scored]
+    predicted = forecast["Predicted Price"].to_numpy()[scored]
+    bounds = stats.reindex(pairs[scored])
+
+    sums = []
+    for clip in clips:
+        values = predicted
+        if clip is not None:
+            values = np.clip(predicted, bounds["min"].to_numpy() * clip[0], bounds["max"].to_numpy() * clip[1])
+        error = values - actual
+        frame = pd.DataFrame({
+            "Clip": clip_label(clip),
+            "Crop": forecast["Crop"].to_numpy()[scored],
+            "Step": forecast["Step"].to_numpy()[scored],
+            "n": 1,
+            "abs_pct": np.abs(error) / actual,
+            "sq": error ** 2,
+        })
+        sums.append(frame.groupby(["Clip", "Crop", "Step"])[SUM_COLUMNS].sum())
+    return pd.concat(sums)
+
+
+def _evaluate(args):
+    return evaluate_origin(*args)
+
+
+def backtest(data_path=None, horizon=DEFAULT_HORIZON, clips=(CLIP_BOUNDS, None),
+             min_history=MIN_HISTORY, every=1, workers=None):
+    """
+    Error sums per (Clip, Crop, Step) over every origin, computed in a
+    process pool of `workers` processes (in this process when workers is 1).
+    """
+    history = load_price_history(data_path)
+    tasks = [(origin, horizon, list(clips), min_history) for origin in origins(history, min_history, every)]
+    del history
+
+    with span("backtest.run"):
+        if workers == 1:
+            _init_worker(data_path)
+            results = list(map(_evaluate, tasks))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+                results = list(pool.map(_evaluate, tasks))
+
+    sums = [result for result in results if result is not None]
+    if not sums:
+        return pd.DataFrame(columns=["Clip", "Crop", "Step"] + SUM_COLUMNS)
+    return pd.concat(sums).groupby(level=["Clip", "Crop", "Step"]).sum().reset_index()
+
+
+def metrics(sums, by=("Clip", "Step")):
+    """
+    MAPE (%) and RMSE with their sample counts, grouped by the given columns.
+    """
+    grouped = sums.groupby(list(by))[SUM_COLUMNS].sum()
+    return pd.DataFrame({
+        "n": grouped["n"],
+        "MAPE %": 100 * grouped["abs_pct"] / grouped["n"],
+        "RMSE": np.sqrt(grouped["sq"] / grouped["n"]),
+    }).round(3)
+
+
+def _cache_path(data_path, settings):
+    key = json.dumps({"data": str(price_data_version(data_path)), **settings}, sort_keys=True)
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(BACKTEST_DIR, f"{file_digest(PRICE_MODEL_FILE)[:16]}-{digest}.csv")
+
+
+def cached_backtest(data_path=None, horizon=DEFAULT_HORIZON, clips=(CLIP_BOUNDS, None),
+                    min_history=MIN_HISTORY, every=1, workers=None, force=False):
+    """
+    backtest() results, read from models/price_backtests/ when this model
+    file, price history and settings were backtested before.
+    Returns (sums, cache path, whether it came from the cache).
+    """
+    settings = {"horizon": horizon, "clips": [clip_label(clip) for clip in clips],
+                "min_history": min_history, "every": every}
+    path = _cache_path(data_path, settings)
+    if not force and os.path.exists(path):
+        return pd.read_csv(path), path, True
+
+    sums = backtest(data_path, horizon, clips, min_history, every, workers)
+    os.makedirs(BACKTEST_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    sums.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return sums, path, False
+
+
+def _parse_clip(value):
+    if value == "none":
+        return None
+    lower, upper = value.split(",")
+    return float(lower), float(upper)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the price forecast.")
+    parser.add_argument("--data", help="CSV file or price store directory (default: as the app)")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON)
+    parser.add_argument("--clip", action="append", type=_parse_clip,
+                        help=f"clip bounds as LOWER,UPPER or 'none'; repeatable "
+                             f"(default: {CLIP_BOUNDS[0]},{CLIP_BOUNDS[1]} and none)")
+    parser.add_argument("--min-history", type=int, default=MIN_HISTORY,
+                        help="months of history a pair needs at an origin")
+    parser.add_argument("--every", type=int, default=1, help="months between origins")
+    parser.add_argument("--workers", type=int, help="process pool size (default: CPU count)")
+    parser.add_argument("--by-crop", action="store_true", help="report per crop as well")
+    parser.add_argument("--force", action="store_true", help="ignore cached results")
+    args = parser.parse_args()
+
+    clips = args.clip or [CLIP_BOUNDS, None]
+    start = time.perf_counter()
+    sums, path, cached = cached_backtest(args.data, args.horizon, clips, args.min_history,
+                                         args.every, args.workers, args.force)
+    if sums.empty:
+        print("⚠️ Not enough history to backtest.")
+        raise SystemExit(1)
+
+    source = "cached" if cached else f"computed in {time.perf_counter() - start:.1f}s"
+    print(f"✅ Backtest {source}: {path}\n")
+    print(metrics(sums, ("Clip", "Step")).to_string())
+    print("\nAll steps:")
+    print(metrics(sums, ("Clip",)).to_string())
+    if args.by_crop:
+        print("\nPer crop:")
+        print(metrics(sums, ("Clip", "Crop")).to_string())
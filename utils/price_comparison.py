@@ -0,0 +1,183 @@
+"""
+Forecast comparison across many crop/city pairs.
+
+Forecasts for all selected pairs come from one ForecastCache.get_many call, so
+the cache misses among them cost a single batched forecast_prices call. They
+are stacked into a pairs x months price matrix, and the summary metrics (best
+sell month, spread, upside over the last price) are column-wise NumPy
+reductions over it. Figures are a heatmap of the change against each pair's
+last price, which works for hundreds of pairs, or small multiples for a few.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.forecast_cache import forecast_cache
+from utils.instrumentation import span
+
+# Pairs compared at once; the heatmap stays responsive up to about this many
+MAX_COMPARISON_PAIRS = 1000
+# Up to this many pairs can be drawn as small multiples; more need the heatmap
+MAX_SMALL_MULTIPLES = 12
+SMALL_MULTIPLE_COLUMNS = 3
+# Heatmap row height in pixels, and the figure height bounds
+HEATMAP_ROW_PX = 18
+HEATMAP_HEIGHT_PX = (300, 4000)
+
+
+def pair_index(history):
+    """
+    Every (crop, city) pair in history with its last observed price.
+    """
+    last = history.sort_values("Date", kind="stable").groupby(["Crop", "City"], sort=False)["Modal Price"].last()
+    return last.rename("Last Price")
+
+
+def select_pairs(pairs, crops, cities):
+    """
+    Pairs of pair_index() whose crop is in crops and city in cities (all
+    cities when cities is empty).
+    """
+    mask = pairs.index.get_level_values("Crop").isin(crops)
+    if cities:
+        mask &= pairs.index.get_level_values("City").isin(cities)
+    return list(pairs.index[mask])
+
+
+def forecast_matrix(forecasts, pairs, horizon):
+    """
+    Stack get_many() output into (pairs, months, prices): the pairs that have
+    a forecast, and len(pairs) x horizon arrays of forecast months
+    (datetime64[M]) and prices (None when no pair has one).
+    """
+    pairs = [pair for pair in pairs if pair in forecasts]
+    if not pairs:
+        return pairs, None, None
+    # Steps are consecutive months, so only the first date is read per pair
+    first = np.array([forecasts[pair]["Date"].iat[0] for pair in pairs], dtype="datetime64[M]")
+    months = first[:, None] + np.arange(horizon)
+    prices = np.stack([forecasts[pair]["Predicted Price"].to_numpy()[:horizon] for pair in pairs])
+    return pairs, months, prices
+
+
+def summarize(pairs, months, prices, last_prices):
+    """
+    One row per pair: the best month to sell, the forecast price range over
+    the horizon, and the change from the last observed price.
+    """
+    rows = np.arange(len(pairs))
+    best = prices.argmax(axis=1)
+    best_price = prices[rows, best]
+    low, high = prices.min(axis=1), prices.max(axis=1)
+    last = np.asarray(last_prices, dtype=np.float64)
+    index = pd.MultiIndex.from_tuples(pairs, names=["Crop", "City"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary = pd.DataFrame({
+            "Last Price": last,
+            "Best Sell Month": months[rows, best].astype(str),
+            "Best Price": best_price,
+            "Lowest Price": low,
+            "Spread": high - low,
+            "Spread %": 100 * (high - low) / prices.mean(axis=1),
+            "Upside %": 100 * (best_price / last - 1),
+        }, index=index)
+    return summary.sort_values("Upside %", ascending=False).round(2)
+
+
+def city_spread(pairs, months, prices):
+    """
+    Per calendar month, the gap between the most and least expensive city of
+    each crop. Pairs forecast from different origins cover different months,
+    so prices are aligned on the month, not the forecast step; months with
+    fewer than two cities are left empty. Rows are crops, columns YYYY-MM.
+    """
+    horizon = prices.shape[1]
+    crops = np.repeat([crop for crop, _ in pairs], horizon)
+    # YYYY-MM strings sort chronologically
+    frame = pd.DataFrame({"Crop": crops, "Month": months.ravel().astype(str), "Price": prices.ravel()})
+    by_month = frame.groupby(["Crop", "Month"])["Price"].agg(["max", "min", "count"])
+    by_month = by_month[by_month["count"] >= 2]
+    if by_month.empty:
+        return pd.DataFrame()
+    return (by_month["max"] - by_month["min"]).unstack("Month").round(2)
+
+
+def _labels(pairs):
+    return [f"{crop} · {city}" for crop, city in pairs]
+
+
+def heatmap_figure(pairs, months, prices, last_prices):
+    """
+    Pairs x forecast months, coloured by % change against each pair's last
+    price so crops with different price levels share one scale.
+    """
+    import plotly.graph_objs as go
+
+    last = np.asarray(last_prices, dtype=np.float64)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = 100 * (prices / last - 1)
+    steps = [f"+{step}" for step in range(1, prices.shape[1] + 1)]
+    low, high = HEATMAP_HEIGHT_PX
+
+    with span("render.comparison_heatmap"):
+        fig = go.Figure(go.Heatmap(
+            z=change,
+            x=steps,
+            y=_labels(pairs),
+            customdata=months.astype(str),
+            text=prices.round(2),
+            hovertemplate="%{y}<br>%{customdata}: ₹%{text} (%{z:+.1f}%)<extra></extra>",
+            colorscale="RdYlGn",
+            zmid=0,
+            colorbar={"title": "% vs last"},
+        ))
+        fig.update_layout(
+            xaxis_title="Months ahead",
+            yaxis={"autorange": "reversed"},
+            height=min(high, max(low, HEATMAP_ROW_PX * len(pairs) + 120)),
+            title="Forecast change against last price",
+        )
+    return fig
+
+
+def small_multiples_figure(pairs, months, prices):
+    """
+    One forecast line per pair in a grid, each with its own price axis.
+    """
+    import plotly.graph_objs as go
+    from plotly.subplots import make_subplots
+
+    rows = -(-len(pairs) // SMALL_MULTIPLE_COLUMNS)
+    with span("render.comparison_small_multiples"):
+        fig = make_subplots(rows=rows, cols=SMALL_MULTIPLE_COLUMNS, subplot_titles=_labels(pairs))
+        for i, (pair_months, pair_prices) in enumerate(zip(months, prices)):
+            fig.add_trace(go.Scatter(
+                x=pair_months.astype(str),
+                y=pair_prices,
+                mode="lines+markers",
+                showlegend=False,
+            ), row=i // SMALL_MULTIPLE_COLUMNS + 1, col=i % SMALL_MULTIPLE_COLUMNS + 1)
+        fig.update_layout(height=260 * rows, title="Predicted prices (INR)")
+    return fig
+
+
+def compare(pairs, last_prices, horizon, view="heatmap"):
+    """
+    (summary, city spread, figure) for the pairs, with the forecasts fetched
+    in one batch, or None when no pair has a forecast. last_prices is
+    pair_index() output.
+    """
+    with span("comparison.forecasts"):
+        forecasts = forecast_cache.get_many(pairs)
+        pairs, months, prices = forecast_matrix(forecasts, pairs, horizon)
+    if not pairs:
+        return None
+
+    with span("comparison.summary"):
+        last = last_prices.reindex(pd.MultiIndex.from_tuples(pairs)).to_numpy()
+        summary = summarize(pairs, months, prices, last)
+        spread = city_spread(pairs, months, prices)
+    if view == "small_multiples" and len(pairs) <= MAX_SMALL_MULTIPLES:
+        fig = small_multiples_figure(pairs, months, prices)
+    else:
+        fig = heatmap_figure(pairs, months, prices, last)
+    return summary, spread, fig
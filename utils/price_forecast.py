@@ -0,0 +1,223 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.file_cache import file_fingerprint
+from utils.instrumentation import increment, span
+from utils.price_store import PRICE_STORE_DIR, read_prices, store_exists, store_version
+from utils.seasonal_index import SeasonalIndexTable
+
+PRICE_DATA_FILE = "data/price_data.csv"
+
+FEATURE_COLUMNS = [
+    "Month_sin", "Month_cos", "Seasonal_Index", "Lagged_Price", "Price_MA3",
+    "min", "max", "mean", "Trend"
+]
+
+# Forecasts are kept within these multiples of each pair's historical min/max
+CLIP_BOUNDS = (0.85, 1.15)
+
+PRICE_ARTIFACT_SCHEMA_VERSION = 1
+PRICE_ARTIFACT_KEYS = ["model", "encoder", "historical_stats", "trend"]
+
+
+class PerCropRegressor:
+    """
+    One regressor per crop behind a single predict(). Rows are routed to their
+    crop's model using the one-hot Crop_* feature columns.
+    """
+
+    def __init__(self, models, crop_columns):
+        self.models = models
+        self.crop_columns = crop_columns
+
+    def predict(self, X):
+        crop_flags = X[self.crop_columns].to_numpy()
+        crops = np.array(self.crop_columns)[np.argmax(crop_flags, axis=1)]
+        predictions = np.full(len(X), np.nan)
+        for column, model in self.models.items():
+            rows = crops == column
+            if rows.any():
+                predictions[rows] = model.predict(X[rows])
+        return predictions
+
+
+def validate_price_artifact(saved_data):
+    """
+    Check a loaded price model artifact before it is used; raises ValueError.
+    Artifacts without a schema_version predate the training module and are
+    only checked for the required keys.
+    """
+    if not isinstance(saved_data, dict):
+        raise ValueError(f"Price model artifact must be a dict, got {type(saved_data).__name__}")
+    missing = [key for key in PRICE_ARTIFACT_KEYS if key not in saved_data]
+    if missing:
+        raise ValueError(f"Price model artifact is missing {missing}")
+
+    schema_version = saved_data.get("schema_version")
+    if schema_version is None:
+        return saved_data
+    if schema_version != PRICE_ARTIFACT_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported price model schema version {schema_version}; "
+                         f"expected {PRICE_ARTIFACT_SCHEMA_VERSION}")
+    expected = list(saved_data["encoder"].get_feature_names_out(["Crop"])) + FEATURE_COLUMNS
+    if list(saved_data.get("feature_names", [])) != expected:
+        raise ValueError("Price model feature names do not match the forecaster's features")
+    return saved_data
+
+
+def load_price_history(path=None, crops=None, cities=None, start=None, end=None):
+    """
+    Read the historical price data with parsed dates.
+
+    path may be a CSV file or a partitioned price store directory. By default
+    the store (utils.price_store) is used once it has been populated, falling
+    back to data/price_data.csv. Filters are pushed down to the store so only
+    the needed crop partitions are read.
+    """
+    if path is None:
+        path = PRICE_STORE_DIR if store_exists() else PRICE_DATA_FILE
+    increment("file_reads")
+    if os.path.isdir(path):
+        with span("data_load.price_store"):
+            return read_prices(crops, cities, start, end, store_dir=path)
+
+    with span("data_load.price_csv"):
+        df = pd.read_csv(path)
+        df["Date"] = pd.to_datetime(df["Date"])
+    if crops is not None:
+        df = df[df["Crop"].isin(list(crops))]
+    if cities is not None:
+        df = df[df["City"].isin(list(cities))]
+    if start is not None:
+        df = df[df["Date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["Date"] <= pd.Timestamp(end)]
+    return df
+
+
+def price_data_version(path=None):
+    """
+    Change marker for the price history source (CSV file or store directory).
+    """
+    if path is None:
+        path = PRICE_STORE_DIR if store_exists() else PRICE_DATA_FILE
+    if os.path.isdir(path):
+        return store_version(path)
+    return file_fingerprint(path)
+
+
+def forecast_prices(history, saved_data, pairs=None, horizon=5, start_date=None, seasonal_index=None,
+                    clip_bounds=CLIP_BOUNDS):
+    """
+    Recursive monthly price forecast for many (Crop, City) pairs in one pass.
+
+    Args:
+        history: DataFrame with Crop, City, Date and Modal Price columns.
+        saved_data: Price model artifact (model, encoder, historical_stats, trend).
+        pairs: Iterable of (crop, city) tuples. Defaults to every pair in history
+            whose crop the model knows.
+        horizon: Number of months to forecast.
+        start_date: Forecast origin. Only history up to this date is used; the
+            default is each pair's last observation.
+        seasonal_index: SeasonalIndexTable to read seasonal indices from.
+            Defaults to one derived from the (cut-off) history.
+        clip_bounds: (lower, upper) multiples of each pair's historical min
+            and max that predictions are clipped to, or None to leave them
+            unclipped.
+
+    Returns:
+        DataFrame with Crop, City, Step, Date and Predicted Price columns,
+        one row per pair and month.
+    """
+    model = saved_data["model"]
+    encoder = saved_data["encoder"]
+    historical_stats = saved_data["historical_stats"].set_index("Crop")
+    trend = saved_data["trend"]
+
+    if start_date is not None:
+        history = history[history["Date"] <= pd.Timestamp(start_date)]
+    history = history.sort_values("Date", kind="stable")
+
+    # Last price, MA3 and price range per pair
+    by_pair = history.groupby(["Crop", "City"], sort=False)
+    prices = by_pair["Modal Price"]
+    state = pd.DataFrame({
+        "last_date": by_pair["Date"].last(),
+        "last_price": prices.last(),
+        "last_ma3": by_pair.tail(3).groupby(["Crop", "City"], sort=False)["Modal Price"].mean(),
+        "hist_min": prices.min(),
+        "hist_max": prices.max(),
+    })
+
+    if pairs is None:
+        state = state[state.index.get_level_values("Crop").isin(historical_stats.index)]
+    else:
+        pairs = list(pairs)
+        unknown = sorted({crop for crop, _ in pairs if crop not in historical_stats.index})
+        if unknown:
+            raise ValueError(f"Price model has no statistics for crops: {unknown}")
+        state = state.reindex(pd.MultiIndex.from_tuples(pairs, names=["Crop", "City"])).dropna()
+
+    columns = list(encoder.get_feature_names_out(["Crop"])) + FEATURE_COLUMNS
+    if state.empty:
+        return pd.DataFrame(columns=["Crop", "City", "Step", "Date", "Predicted Price"])
+
+    crops = state.index.get_level_values("Crop").to_numpy()
+    cities = state.index.get_level_values("City").to_numpy()
+    n_pairs, n_encoded = len(state), len(columns) - len(FEATURE_COLUMNS)
+
+    # Future dates and their calendar features, shape (n_pairs, horizon)
+    if start_date is None:
+        origin = pd.DatetimeIndex(state["last_date"])
+    else:
+        origin = pd.DatetimeIndex([pd.Timestamp(start_date)] * n_pairs)
+    future_dates = np.stack([(origin + pd.DateOffset(months=step)).to_numpy()
+                             for step in range(1, horizon + 1)], axis=1)
+    months = pd.DatetimeIndex(future_dates.ravel()).month.to_numpy().reshape(n_pairs, horizon)
+    month_sin = np.sin(2 * np.pi * months / 12)
+    month_cos = np.cos(2 * np.pi * months / 12)
+    if seasonal_index is None:
+        seasonal_index = SeasonalIndexTable.from_history(history)
+    seasonal = seasonal_index.lookup_many(crops, cities, months)
+
+    # Preallocated feature matrix; static columns are filled once
+    features = np.empty((n_pairs, len(columns)))
+    features[:, :n_encoded] = encoder.transform(pd.DataFrame({"Crop": crops}))
+    static = n_encoded + FEATURE_COLUMNS.index("min")
+    features[:, static:static + 3] = historical_stats.loc[crops, ["min", "max", "mean"]].to_numpy()
+    features[:, static + 3] = [trend[crop] for crop in crops]
+
+    current_price = state["last_price"].to_numpy(dtype=float)
+    current_ma3 = state["last_ma3"].to_numpy(dtype=float)
+    predictions = np.empty((n_pairs, horizon))
+    for step in range(horizon):
+        features[:, n_encoded] = month_sin[:, step]
+        features[:, n_encoded + 1] = month_cos[:, step]
+        features[:, n_encoded + 2] = seasonal[:, step]
+        features[:, n_encoded + 3] = current_price
+        features[:, n_encoded + 4] = current_ma3
+
+        # One predict call per step for every pair
+        with span("inference.price_predict"):
+            pred = model.predict(pd.DataFrame(features, columns=columns, copy=False))
+        predictions[:, step] = pred
+
+        # Update lagged price and moving average
+        current_price = pred
+        current_ma3 = (current_ma3 * 3 - current_ma3 + pred) / 3  # Simplified MA update
+
+    # Constrain predictions to historical range
+    if clip_bounds is not None:
+        lower = state["hist_min"].to_numpy(dtype=float)[:, None] * clip_bounds[0]
+        upper = state["hist_max"].to_numpy(dtype=float)[:, None] * clip_bounds[1]
+        predictions = np.clip(predictions, lower, upper)
+
+    return pd.DataFrame({
+        "Crop": np.repeat(crops, horizon),
+        "City": np.repeat(cities, horizon),
+        "Step": np.tile(np.arange(1, horizon + 1), n_pairs),
+        "Date": future_dates.ravel(),
+        "Predicted Price": predictions.ravel(),
+    })
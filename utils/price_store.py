@@ -0,0 +1,175 @@
+"""
+Partitioned Parquet store for mandi price history.
+
+Usage (from the repository root):
+    python -m utils.price_store ingest feeds/prices-2025-*.csv feeds/agmarknet.jsonl
+    python -m utils.price_store ingest data/price_data.csv --chunksize 200000
+
+Source files are streamed in chunks, normalized to the Crop / City / Date /
+Modal Price / Seasonal_Index schema of price_data.csv and written as one
+directory per crop (data/price_store/Crop=<crop>/). After a run every touched
+partition is compacted: duplicates on (Crop, City, Date) are dropped, keeping
+the most recently ingested row. Readers pass crop/city/date filters, so only
+the matching partitions and row groups are read.
+"""
+import glob
+import os
+import time
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from utils.file_cache import file_fingerprint
+
+PRICE_STORE_DIR = os.environ.get("AGRI_PRICE_STORE_DIR", "data/price_store")
+COLUMNS = ["Crop", "City", "Date", "Modal Price", "Seasonal_Index"]
+KEY_COLUMNS = ["Crop", "City", "Date"]
+COMPACTED_FILE = "00000-compacted.parquet"
+
+# Column names used by common mandi feeds, lower-cased, mapped to ours
+COLUMN_ALIASES = {
+    "crop": "Crop", "commodity": "Crop",
+    "city": "City", "market": "City", "mandi": "City",
+    "date": "Date", "arrival_date": "Date", "price_date": "Date",
+    "modal price": "Modal Price", "modal_price": "Modal Price", "modal_price_(rs./quintal)": "Modal Price",
+    "seasonal_index": "Seasonal_Index", "seasonal index": "Seasonal_Index",
+}
+
+
+def normalize_prices(chunk):
+    """
+    Map a raw feed chunk onto the price_data.csv schema and drop bad rows.
+    """
+    chunk = chunk.rename(columns=lambda name: COLUMN_ALIASES.get(str(name).strip().lower(), name))
+    missing = [column for column in ["Crop", "City", "Date", "Modal Price"] if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Price feed is missing columns {missing}")
+    if "Seasonal_Index" not in chunk.columns:
+        chunk["Seasonal_Index"] = float("nan")
+
+    chunk = chunk[COLUMNS].copy()
+    chunk["Crop"] = chunk["Crop"].astype(str).str.strip().str.title()
+    chunk["City"] = chunk["City"].astype(str).str.strip().str.title()
+    chunk["Date"] = pd.to_datetime(chunk["Date"], errors="coerce", dayfirst=False)
+    chunk["Modal Price"] = pd.to_numeric(chunk["Modal Price"], errors="coerce")
+    chunk["Seasonal_Index"] = pd.to_numeric(chunk["Seasonal_Index"], errors="coerce")
+    chunk = chunk.dropna(subset=["Date", "Modal Price"])
+    return chunk.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+
+
+def iter_source_chunks(path, chunksize=100_000):
+    """
+    Stream raw chunks from a CSV or JSON-lines file.
+    """
+    if path.endswith((".jsonl", ".json", ".ndjson")):
+        with pd.read_json(path, lines=True, chunksize=chunksize) as reader:
+            yield from reader
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _partition_dir(store_dir, crop):
+    return os.path.join(store_dir, f"Crop={quote(crop, safe='')}")
+
+
+def compact_partition(partition):
+    """
+    Merge a partition's files into one, keeping the latest row per (City, Date).
+    """
+    parts = sorted(glob.glob(os.path.join(partition, "*.parquet")))
+    if len(parts) <= 1:
+        return
+    frame = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    frame = frame.drop_duplicates(subset=["City", "Date"], keep="last").sort_values(["City", "Date"])
+    tmp_path = os.path.join(partition, f"{COMPACTED_FILE}.tmp")
+    frame.to_parquet(tmp_path, index=False, row_group_size=100_000)
+    os.replace(tmp_path, os.path.join(partition, COMPACTED_FILE))
+    for part in parts:
+        if os.path.basename(part) != COMPACTED_FILE:
+            os.remove(part)
+
+
+def ingest(paths, store_dir=PRICE_STORE_DIR, chunksize=100_000):
+    """
+    Stream price feeds into the partitioned store. Returns rows written per crop.
+    """
+    written = {}
+    run_id = time.time_ns()
+    sequence = 0
+    for path in paths:
+        for chunk in iter_source_chunks(path, chunksize):
+            chunk = normalize_prices(chunk)
+            for crop, rows in chunk.groupby("Crop", sort=False):
+                partition = _partition_dir(store_dir, crop)
+                os.makedirs(partition, exist_ok=True)
+                # Part names sort in ingestion order, after the compacted file
+                part = os.path.join(partition, f"part-{run_id}-{sequence:06d}.parquet")
+                rows.drop(columns="Crop").to_parquet(part, index=False)
+                sequence += 1
+                written[crop] = written.get(crop, 0) + len(rows)
+
+    for crop in written:
+        compact_partition(_partition_dir(store_dir, crop))
+    return written
+
+
+def store_exists(store_dir=PRICE_STORE_DIR):
+    return bool(glob.glob(os.path.join(store_dir, "Crop=*", "*.parquet")))
+
+
+def read_prices(crops=None, cities=None, start=None, end=None, store_dir=PRICE_STORE_DIR):
+    """
+    Read price history from the store, pushing filters down to Parquet so only
+    the matching crop partitions and row groups are scanned.
+    """
+    filters = []
+    if crops is not None:
+        filters.append(("Crop", "in", list(crops)))
+    if cities is not None:
+        filters.append(("City", "in", list(cities)))
+    if start is not None:
+        filters.append(("Date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("Date", "<=", pd.Timestamp(end)))
+    frame = pd.read_parquet(store_dir, engine="pyarrow", filters=filters or None)
+    frame["Crop"] = frame["Crop"].astype(str)
+    return frame[COLUMNS].sort_values(["Crop", "City", "Date"], kind="stable").reset_index(drop=True)
+
+
+def list_crops(store_dir=PRICE_STORE_DIR):
+    """
+    Crops in the store, from the partition directory names alone.
+    """
+    partitions = glob.glob(os.path.join(store_dir, "Crop=*"))
+    return sorted(unquote(os.path.basename(partition)[len("Crop="):]) for partition in partitions)
+
+
+def store_version(store_dir=PRICE_STORE_DIR):
+    """
+    Change marker for the whole store: latest mtime and total size of its files.
+    """
+    fingerprints = [file_fingerprint(path) for path in
+                    glob.glob(os.path.join(store_dir, "Crop=*", "*.parquet"))]
+    if not fingerprints:
+        raise FileNotFoundError(f"Price store '{store_dir}' is empty.")
+    return (max(mtime for mtime, _ in fingerprints), sum(size for _, size in fingerprints))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest price feeds into the partitioned store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="stream CSV/JSONL feeds into the store")
+    ingest_parser.add_argument("sources", nargs="+", help="CSV or JSONL files (globs allowed)")
+    ingest_parser.add_argument("--store", default=PRICE_STORE_DIR)
+    ingest_parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sources = sorted({path for pattern in args.sources for path in glob.glob(pattern)})
+    if not sources:
+        raise SystemExit(f"No files match {args.sources}")
+    start = time.perf_counter()
+    written = ingest(sources, args.store, args.chunksize)
+    print(f"✅ Ingested {sum(written.values())} rows for {len(written)} crops into {args.store} "
+          f"in {time.perf_counter() - start:.1f}s")
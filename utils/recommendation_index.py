@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from utils.file_cache import FileCache
+from utils.instrumentation import increment, span
+
+RECOMMENDATION_DATA_FILE = "data/recommendation_data.csv"
+SUPPORTED_REGIONS = ["North Karnataka", "South Karnataka"]
+
+_indexes = FileCache()
+
+
+class RecommendationIndex:
+    """
+    Per-(region, crop_type) aggregates of the historical recommendation data.
+
+    Holds the mean expected_return_per_acre, mean demand_score and row count
+    for every (region, crop_type) pair, plus the crops seen in each region in
+    order of first appearance (used as the fallback list).
+    """
+
+    def __init__(self, stats, region_crops):
+        self.stats = stats
+        self.region_crops = region_crops
+
+    def lookup(self, region, crop):
+        """
+        Return (mean_return_per_acre, mean_demand_score, count) or None.
+        """
+        return self.stats.get((region, crop))
+
+    def crops_for(self, region):
+        return self.region_crops.get(region, [])
+
+    def as_arrays(self, regions, crops):
+        """
+        Dense (len(regions), len(crops)) tables of mean return, mean demand and
+        counts for vectorized lookups. Missing pairs have a count of 0.
+        """
+        returns = np.zeros((len(regions), len(crops)))
+        demands = np.zeros((len(regions), len(crops)))
+        counts = np.zeros((len(regions), len(crops)), dtype=np.int64)
+        crop_positions = {crop: j for j, crop in enumerate(crops)}
+        for i, region in enumerate(regions):
+            for crop in self.crops_for(region):
+                j = crop_positions.get(crop)
+                if j is not None:
+                    returns[i, j], demands[i, j], counts[i, j] = self.stats[(region, crop)]
+        return returns, demands, counts
+
+
+def _mean(total, count):
+    # NaN when every value was missing, as groupby().mean() gives
+    return total / count if count else np.nan
+
+
+def build_index(path=RECOMMENDATION_DATA_FILE, chunksize=200_000):
+    """
+    Scan the CSV once in chunks and accumulate sums/counts per (region, crop_type).
+    """
+    sums = {}
+    region_crops = {}
+    columns = ["region", "crop_type", "expected_return_per_acre", "demand_score"]
+    increment("file_reads")
+    with span("data_load.recommendation_csv"):
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+            chunk = chunk[chunk["region"].isin(SUPPORTED_REGIONS)]
+            # Sums skip NaN, so each mean is divided by its column's non-null count
+            grouped = chunk.groupby(["region", "crop_type"], sort=False).agg(
+                return_sum=("expected_return_per_acre", "sum"),
+                return_count=("expected_return_per_acre", "count"),
+                demand_sum=("demand_score", "sum"),
+                demand_count=("demand_score", "count"),
+                count=("crop_type", "size"),
+            )
+            for (region, crop), row in grouped.iterrows():
+                total = sums.setdefault((region, crop), [0.0, 0, 0.0, 0, 0])
+                total[0] += row["return_sum"]
+                total[1] += int(row["return_count"])
+                total[2] += row["demand_sum"]
+                total[3] += int(row["demand_count"])
+                total[4] += int(row["count"])
+                crops = region_crops.setdefault(region, [])
+                if crop not in crops:
+                    crops.append(crop)
+
+    stats = {
+        key: (_mean(return_sum, return_count), _mean(demand_sum, demand_count), count)
+        for key, (return_sum, return_count, demand_sum, demand_count, count) in sums.items()
+    }
+    return RecommendationIndex(stats, region_crops)
+
+
+def get_recommendation_index(path=RECOMMENDATION_DATA_FILE):
+    """
+    Shared index for path, rebuilt only when the CSV changes.
+    """
+    try:
+        return _indexes.get(path, build_index)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Data file '{path}' not found.")
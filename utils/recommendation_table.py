@@ -0,0 +1,272 @@
+"""
+Precomputed crop rankings for every region x soil type x land-size interval.
+
+The crop model sees (soil_type, region, land_size), and only land_size is
+continuous. Its trees split land_size at a finite set of thresholds, so
+between two consecutive thresholds the forest's output, and with it the
+ranking of crops, is constant. The table stores, per (region, soil) cell, the
+thresholds where the ranking changes and the ranking of class positions on
+each side. recommend_crops then needs a binary search instead of sklearn.
+
+Build and verify it for the published crop model with:
+    python -m utils.recommendation_table
+"""
+import os
+
+import numpy as np
+
+from utils.file_cache import FileCache, file_digest
+from utils.model_registry import CROP_MODEL_FILE
+
+RECOMMENDATION_TABLE_FILE = "models/recommendation_table.npz"
+# recommend_crops passes (soil_type, region, land_size) columns
+SOIL_COLUMN, REGION_COLUMN, LAND_COLUMN = 0, 1, 2
+
+_tables = FileCache()
+
+
+def _largest_float32_at_most(value):
+    candidate = np.float32(value)
+    if float(candidate) > value:
+        candidate = np.nextafter(candidate, np.float32(-np.inf))
+    return candidate
+
+
+def _smallest_float32_above(value):
+    candidate = np.float32(value)
+    if float(candidate) <= value:
+        candidate = np.nextafter(candidate, np.float32(np.inf))
+    return candidate
+
+
+def land_thresholds(model):
+    """
+    Sorted unique land_size split thresholds over all trees of the forest.
+    """
+    thresholds = [est.tree_.threshold[est.tree_.feature == LAND_COLUMN] for est in model.estimators_]
+    return np.unique(np.concatenate(thresholds))
+
+
+def _grid(n_regions, n_soils, land):
+    """
+    Model input rows for every cell x land value, cell-major.
+    """
+    n_cells = n_regions * n_soils
+    regions, soils = np.divmod(np.repeat(np.arange(n_cells), len(land)), n_soils)
+    X = np.empty((len(regions), 3))
+    X[:, SOIL_COLUMN] = soils
+    X[:, REGION_COLUMN] = regions
+    X[:, LAND_COLUMN] = np.tile(land, n_cells)
+    return X
+
+
+def rank_classes(probas):
+    """
+    Class positions by descending probability, ordered like recommend_crops.
+    """
+    return np.stack([np.argsort(row)[::-1] for row in probas])
+
+
+class RecommendationTable:
+    """
+    Ragged per-cell arrays: cell c = region_code * n_soils + soil_code owns
+    breakpoints[break_offsets[c]:break_offsets[c + 1]] and one more ranking
+    row than breakpoints, starting at rank_offsets[c].
+    """
+
+    def __init__(self, n_regions, n_soils, breakpoints, break_offsets, rankings, rank_offsets,
+                 classes, model_digest=None):
+        self.n_regions = n_regions
+        self.n_soils = n_soils
+        self.breakpoints = breakpoints
+        self.break_offsets = break_offsets
+        self.rankings = rankings
+        self.rank_offsets = rank_offsets
+        # The model's classes_, so callers can map positions without loading it
+        self.classes_ = classes
+        self.model_digest = model_digest
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.breakpoints, self.break_offsets,
+                                              self.rankings, self.rank_offsets))
+
+    def covers(self, land_area):
+        # Anything float32 can represent finitely maps to an interval
+        land = np.float32(land_area)
+        return bool(np.isfinite(land))
+
+    def lookup(self, region_code, soil_code, land_area):
+        """
+        Class positions ranked best first, or None outside the table.
+        """
+        if not (0 <= region_code < self.n_regions and 0 <= soil_code < self.n_soils):
+            return None
+        if not self.covers(land_area):
+            return None
+        cell = region_code * self.n_soils + soil_code
+        breakpoints = self.breakpoints[self.break_offsets[cell]:self.break_offsets[cell + 1]]
+        # The model compares float32 inputs with float64 thresholds (x <= t goes left)
+        interval = np.searchsorted(breakpoints, float(np.float32(land_area)), side="left")
+        return self.rankings[self.rank_offsets[cell] + interval]
+
+    def lookup_many(self, region_codes, soil_codes, land_area):
+        """
+        Vectorized lookup. Returns (rankings, covered): rows that are not
+        covered hold arbitrary values and must go to the model.
+        """
+        region_codes = np.asarray(region_codes, dtype=np.int64)
+        soil_codes = np.asarray(soil_codes, dtype=np.int64)
+        land = np.asarray(land_area, dtype=np.float32)
+        covered = ((region_codes >= 0) & (region_codes < self.n_regions)
+                   & (soil_codes >= 0) & (soil_codes < self.n_soils) & np.isfinite(land))
+        cells = np.where(covered, region_codes * self.n_soils + soil_codes, 0)
+        rows = np.zeros(len(cells), dtype=np.int64)
+        land = land.astype(np.float64)
+        for cell in np.unique(cells[covered]):
+            in_cell = covered & (cells == cell)
+            breakpoints = self.breakpoints[self.break_offsets[cell]:self.break_offsets[cell + 1]]
+            rows[in_cell] = self.rank_offsets[cell] + np.searchsorted(breakpoints, land[in_cell], side="left")
+        return self.rankings[rows], covered
+
+    def save(self, path=RECOMMENDATION_TABLE_FILE):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, n_regions=self.n_regions, n_soils=self.n_soils,
+                 breakpoints=self.breakpoints, break_offsets=self.break_offsets,
+                 rankings=self.rankings, rank_offsets=self.rank_offsets, classes=self.classes_,
+                 model_digest=np.array(self.model_digest or ""))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=RECOMMENDATION_TABLE_FILE):
+        with np.load(path) as data:
+            return cls(
+                n_regions=int(data["n_regions"]),
+                n_soils=int(data["n_soils"]),
+                breakpoints=data["breakpoints"],
+                break_offsets=data["break_offsets"],
+                rankings=data["rankings"],
+                rank_offsets=data["rank_offsets"],
+                classes=data["classes"],
+                model_digest=str(data["model_digest"]) or None,
+            )
+
+
+def build_table(model, n_regions, n_soils, model_digest=None):
+    """
+    Evaluate the forest once per (region, soil, land interval) and merge
+    neighbouring intervals with the same ranking.
+    """
+    thresholds = land_thresholds(model)
+    uppers = list(thresholds) + [np.inf]
+
+    # One float32 representative per interval (t[i-1], t[i]]; intervals that
+    # contain no float32 value can never be hit and are skipped
+    representatives, kept = [], []
+    for i, upper in enumerate(uppers):
+        if i == len(thresholds):
+            value = _smallest_float32_above(uppers[i - 1]) if i else np.float32(1)
+        else:
+            value = _largest_float32_at_most(upper)
+        if i == 0 or float(value) > uppers[i - 1]:
+            representatives.append(value)
+            kept.append(i)
+    representatives = np.array(representatives, dtype=np.float32)
+
+    # The whole grid in one predict_proba call
+    n_cells = n_regions * n_soils
+    rankings = rank_classes(model.predict_proba(_grid(n_regions, n_soils, representatives)))
+    rankings = rankings.reshape(n_cells, len(representatives), -1)
+
+    breakpoints, break_offsets, table_rankings, rank_offsets = [], [0], [], [0]
+    for cell in range(n_cells):
+        cell_uppers, cell_rankings = [], []
+        for interval, ranking in zip(kept, rankings[cell]):
+            if cell_rankings and np.array_equal(cell_rankings[-1], ranking):
+                cell_uppers[-1] = uppers[interval]
+            else:
+                cell_uppers.append(uppers[interval])
+                cell_rankings.append(ranking)
+        breakpoints += cell_uppers[:-1]
+        table_rankings += cell_rankings
+        break_offsets.append(len(breakpoints))
+        rank_offsets.append(len(table_rankings))
+
+    return RecommendationTable(
+        n_regions=n_regions,
+        n_soils=n_soils,
+        breakpoints=np.array(breakpoints, dtype=np.float64),
+        break_offsets=np.array(break_offsets, dtype=np.int64),
+        rankings=np.array(table_rankings, dtype=np.int8),
+        rank_offsets=np.array(rank_offsets, dtype=np.int64),
+        classes=np.asarray(model.classes_),
+        model_digest=model_digest,
+    )
+
+
+def verify_table(table, model, samples_per_cell=2000, seed=0):
+    """
+    Compare the table with the live model on every breakpoint's float32
+    neighbours plus random land sizes. Returns (checked, mismatches).
+    """
+    rng = np.random.default_rng(seed)
+    thresholds = land_thresholds(model)
+    high = float(thresholds.max()) * 1.5 + 100 if len(thresholds) else 100.0
+    edges = [_largest_float32_at_most(t) for t in thresholds] + [_smallest_float32_above(t) for t in thresholds]
+    land = np.concatenate([
+        np.array(edges, dtype=np.float32),
+        rng.uniform(0, high, samples_per_cell).astype(np.float32),
+        np.arange(1, 1001, dtype=np.float32),
+    ])
+
+    X = _grid(table.n_regions, table.n_soils, land)
+    expected = rank_classes(model.predict_proba(X))
+    actual, covered = table.lookup_many(X[:, REGION_COLUMN], X[:, SOIL_COLUMN], X[:, LAND_COLUMN])
+    mismatches = int((~covered).sum() + (actual[covered] != expected[covered]).any(axis=1).sum())
+    return len(X), mismatches
+
+
+def get_recommendation_table(path=RECOMMENDATION_TABLE_FILE, model_path=CROP_MODEL_FILE):
+    """
+    Shared table for the current crop model, or None when there is no table
+    or it was built for a different model file.
+    """
+    if not os.path.exists(path):
+        return None
+    table = _tables.get(path, RecommendationTable.load)
+    # The model file's digest is recomputed only when its mtime/size change
+    if table.model_digest != _tables.get(model_path, file_digest):
+        return None
+    return table
+
+
+def build_recommendation_table(model_path=CROP_MODEL_FILE, path=RECOMMENDATION_TABLE_FILE):
+    """
+    Build, verify and save the table for the model at model_path.
+    Raises ValueError if the table disagrees with the model anywhere.
+    """
+    import joblib
+    from utils.crop_recommendation import REGION_MAPPING, SOIL_MAPPING
+
+    model = joblib.load(model_path)
+    table = build_table(model, len(REGION_MAPPING), len(SOIL_MAPPING), file_digest(model_path))
+    checked, mismatches = verify_table(table, model)
+    if mismatches:
+        raise ValueError(f"Recommendation table disagrees with {model_path} on "
+                         f"{mismatches} of {checked} inputs")
+    table.save(path)
+    return table, checked
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the crop recommendation lookup table.")
+    parser.add_argument("--model", default=CROP_MODEL_FILE)
+    parser.add_argument("--output", default=RECOMMENDATION_TABLE_FILE)
+    args = parser.parse_args()
+
+    table, checked = build_recommendation_table(args.model, args.output)
+    print(f"✅ {len(table.rankings)} intervals over {table.n_regions * table.n_soils} cells "
+          f"({table.nbytes / 1024:.1f} KiB), matches the model on all {checked} checked inputs; "
+          f"saved to {args.output}")
@@ -0,0 +1,178 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+SEASONAL_INDEX_FILE = "data/seasonal_index.npz"
+
+
+class SeasonalIndexTable:
+    """
+    Crop x city x month seasonal index derived from price history.
+
+    Keeps running sums and counts of the Seasonal_Index column per cell, so new
+    monthly prices are folded in without rescanning the history. Cells with no
+    observations fall back to the crop's mean for that month across cities,
+    then the crop/city mean over all months, then the crop's overall mean,
+    then 1.0. The resolved table is precomputed, so lookups are array indexing.
+    """
+
+    def __init__(self, crops=(), cities=(), sums=None, counts=None, watermark=None, data_version=None):
+        self.crops = list(crops)
+        self.cities = list(cities)
+        shape = (len(self.crops), len(self.cities), 12)
+        self.sums = np.zeros(shape) if sums is None else sums
+        self.counts = np.zeros(shape, dtype=np.int64) if counts is None else counts
+        self.watermark = watermark
+        # Version of the price history the sums were built from, if known
+        self.data_version = data_version
+        self._resolve()
+
+    def _resolve(self):
+        self._crop_positions = {crop.lower(): i for i, crop in enumerate(self.crops)}
+        self._city_positions = {city: j for j, city in enumerate(self.cities)}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cell = self.sums / self.counts
+            crop_month = self.sums.sum(axis=1) / self.counts.sum(axis=1)
+            crop_city = self.sums.sum(axis=2) / self.counts.sum(axis=2)
+            crop_all = self.sums.sum(axis=(1, 2)) / self.counts.sum(axis=(1, 2))
+        table = np.where(np.isnan(cell), crop_month[:, None, :], cell)
+        table = np.where(np.isnan(table), crop_city[:, :, None], table)
+        table = np.where(np.isnan(table), crop_all[:, None, None], table)
+        self.table = np.nan_to_num(table, nan=1.0)
+        # Unknown cities use the crop's month mean (or 1.0)
+        self.crop_table = np.nan_to_num(np.where(np.isnan(crop_month), crop_all[:, None], crop_month),
+                                        nan=1.0)
+
+    def update(self, history):
+        """
+        Fold in rows newer than the watermark. Returns the number of rows added.
+        Rows dated at or before the watermark are assumed already counted;
+        use from_history() to rebuild after backfilling older data.
+        """
+        if "Seasonal_Index" not in history.columns:
+            return 0
+        if self.watermark is not None:
+            history = history[history["Date"] > self.watermark]
+        history = history.dropna(subset=["Seasonal_Index"])
+        if history.empty:
+            return 0
+
+        known_crops = {crop.lower() for crop in self.crops}
+        new_crops = list({c.lower(): c for c in history["Crop"].unique()
+                          if c.lower() not in known_crops}.values())
+        new_cities = [c for c in history["City"].unique() if c not in self.cities]
+        if new_crops or new_cities:
+            self.crops += new_crops
+            self.cities += new_cities
+            shape = (len(self.crops), len(self.cities), 12)
+            sums, counts = np.zeros(shape), np.zeros(shape, dtype=np.int64)
+            old_crops, old_cities, _ = self.sums.shape
+            sums[:old_crops, :old_cities] = self.sums
+            counts[:old_crops, :old_cities] = self.counts
+            self.sums, self.counts = sums, counts
+            self._resolve()
+
+        crop_idx = history["Crop"].str.lower().map(self._crop_positions).to_numpy()
+        city_idx = history["City"].map(self._city_positions).to_numpy()
+        month_idx = history["Date"].dt.month.to_numpy() - 1
+        values = history["Seasonal_Index"].to_numpy(dtype=float)
+        np.add.at(self.sums, (crop_idx, city_idx, month_idx), values)
+        np.add.at(self.counts, (crop_idx, city_idx, month_idx), 1)
+        self.watermark = history["Date"].max()
+        self._resolve()
+        return len(history)
+
+    @classmethod
+    def from_history(cls, history):
+        table = cls()
+        table.update(history)
+        return table
+
+    def lookup(self, crop, city, month):
+        """
+        Seasonal index for one crop, city and month (1-12).
+        """
+        i = self._crop_positions.get(crop.lower())
+        if i is None:
+            return 1.0
+        j = self._city_positions.get(city)
+        if j is None:
+            return float(self.crop_table[i, month - 1])
+        return float(self.table[i, j, month - 1])
+
+    def lookup_many(self, crops, cities, months):
+        """
+        Vectorized lookup. crops/cities have one entry per row; months is
+        (rows,) or (rows, steps). Returns an array shaped like months.
+        """
+        months = np.asarray(months)
+        crop_idx = np.array([self._crop_positions.get(crop.lower(), -1) for crop in crops])
+        city_idx = np.array([self._city_positions.get(city, -1) for city in cities])
+        if months.ndim == 2:
+            crop_idx, city_idx = crop_idx[:, None], city_idx[:, None]
+        safe_crop, safe_city = np.maximum(crop_idx, 0), np.maximum(city_idx, 0)
+        values = np.where(city_idx >= 0, self.table[safe_crop, safe_city, months - 1],
+                          self.crop_table[safe_crop, months - 1])
+        return np.where(crop_idx >= 0, values, 1.0).astype(float)
+
+    def save(self, path=SEASONAL_INDEX_FILE):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, crops=np.array(self.crops), cities=np.array(self.cities),
+                 sums=self.sums, counts=self.counts,
+                 watermark_ns=np.int64(-1 if self.watermark is None else self.watermark.value),
+                 data_version=np.array(self.data_version or ""))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=SEASONAL_INDEX_FILE):
+        with np.load(path) as data:
+            watermark_ns = int(data["watermark_ns"])
+            return cls(
+                crops=data["crops"].tolist(),
+                cities=data["cities"].tolist(),
+                sums=data["sums"],
+                counts=data["counts"],
+                watermark=None if watermark_ns < 0 else pd.Timestamp(watermark_ns),
+                data_version=str(data["data_version"]) if "data_version" in data else None,
+            )
+
+
+def seasonal_index_path(data_file=None):
+    """
+    Table file for a price history source: SEASONAL_INDEX_FILE for the
+    default source, else a file next to data_file named after it.
+    """
+    if data_file is None:
+        return SEASONAL_INDEX_FILE
+    stem = os.path.splitext(os.path.basename(os.path.normpath(data_file)))[0]
+    return os.path.join(os.path.dirname(os.path.normpath(data_file)), f"{stem}_seasonal_index.npz")
+
+
+def update_seasonal_index(history, data_version, path=SEASONAL_INDEX_FILE):
+    """
+    The stored table if it was built from this data_version, else one
+    rebuilt from history and saved. A watermark alone cannot tell whether
+    rows were backfilled or corrected, so any change of the price history
+    rebuilds the table.
+    """
+    if os.path.exists(path):
+        table = SeasonalIndexTable.load(path)
+        if table.data_version == data_version:
+            return table
+    table = SeasonalIndexTable.from_history(history)
+    table.data_version = data_version
+    table.save(path)
+    return table
+
+
+if __name__ == "__main__":
+    from utils.forecast_cache import forecast_cache
+    from utils.price_forecast import load_price_history
+
+    # Stamp the table with the data version the app checks, so its forecast
+    # cache reuses this file instead of rebuilding over it
+    data_version = forecast_cache.current_versions()[0]
+    table = update_seasonal_index(load_price_history(), data_version, seasonal_index_path())
+    print(f"✅ Seasonal index for {len(table.crops)} crops x {len(table.cities)} cities "
+          f"up to date in {seasonal_index_path()}")
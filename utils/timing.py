@@ -0,0 +1,64 @@
+import importlib
+import sys
+import threading
+import time
+from collections import deque
+
+# Process-wide, shared by every session of the app
+_lock = threading.Lock()
+_import_seconds = {}
+_reruns = {}
+_first_rerun = {}
+RERUN_HISTORY = 200
+
+
+def timed_import(name):
+    """
+    Import a module, recording how long the first (cold) import took.
+    Streamlit reruns hit sys.modules afterwards, so later calls cost nothing.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        _import_seconds.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def record_rerun(page, seconds):
+    """
+    Record the wall time of one script rerun for page.
+    """
+    with _lock:
+        _first_rerun.setdefault(page, seconds)
+        _reruns.setdefault(page, deque(maxlen=RERUN_HISTORY)).append(seconds)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def timing_report():
+    """
+    Cold import times and per-page rerun latency (milliseconds).
+    The first rerun of a page includes its imports and cache fills.
+    """
+    with _lock:
+        reruns = {page: list(values) for page, values in _reruns.items()}
+        first = dict(_first_rerun)
+        imports = dict(_import_seconds)
+    return {
+        "imports_ms": {name: round(1000 * seconds, 1) for name, seconds in imports.items()},
+        "reruns_ms": {
+            page: {
+                "count": len(values),
+                "first": round(1000 * first[page], 1),
+                "last": round(1000 * values[-1], 1),
+                "p50": round(1000 * _percentile(values, 0.5), 1),
+                "p95": round(1000 * _percentile(values, 0.95), 1),
+            }
+            for page, values in reruns.items()
+        },
+    }
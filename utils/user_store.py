@@ -0,0 +1,206 @@
+import csv
+import os
+import sqlite3
+import threading
+
+from utils import config
+from utils.instrumentation import increment
+
+COLUMNS = ["username", "password", "role"]
+
+
+class UserStore:
+    """
+    Interface for user-account backends.
+    """
+
+    def get_user(self, username):
+        """
+        Return {"username", "password", "role"} for username, or None.
+        """
+        raise NotImplementedError
+
+    def add_user(self, username, password, role):
+        """
+        Insert a new user. Returns False if the username is already taken.
+        """
+        raise NotImplementedError
+
+    def update_password(self, username, password):
+        """
+        Replace the stored password (hash) for an existing user.
+        """
+        raise NotImplementedError
+
+
+class CsvUserStore(UserStore):
+    """
+    Legacy backend on data/users.csv. New users are appended, not rewritten,
+    but writes are only serialized within one process.
+    """
+
+    def __init__(self, path=config.USER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(COLUMNS)
+
+    def _rows(self):
+        increment("file_reads")
+        with open(self.path, newline="") as f:
+            yield from csv.DictReader(f)
+
+    def get_user(self, username):
+        for row in self._rows():
+            if row["username"] == username:
+                return row
+        return None
+
+    def add_user(self, username, password, role):
+        with self._lock:
+            if self.get_user(username) is not None:
+                return False
+            with open(self.path, "a", newline="") as f:
+                csv.writer(f).writerow([username, password, role])
+            return True
+
+    def update_password(self, username, password):
+        with self._lock:
+            rows = list(self._rows())
+            for row in rows:
+                if row["username"] == username:
+                    row["password"] = password
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=COLUMNS)
+                writer.writeheader()
+                writer.writerows(rows)
+            os.replace(tmp_path, self.path)
+
+
+class SqliteUserStore(UserStore):
+    """
+    SQLite backend in WAL mode with a unique index on username.
+
+    Safe for concurrent signups from several Streamlit worker processes: the
+    unique index rejects duplicates atomically. Looked-up users are cached in
+    process; the cache only holds users that exist, so accounts created by
+    other processes are always found on the next lookup, and it is dropped
+    whenever PRAGMA data_version shows another connection has committed, so
+    password changes made elsewhere are not missed.
+    """
+
+    def __init__(self, path=config.USER_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._cache = {}
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT NOT NULL, password TEXT NOT NULL, role TEXT NOT NULL)"
+            )
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username)")
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _validate_cache(self, conn):
+        # data_version changes when another connection commits; a thread's new
+        # connection has no baseline yet, so it drops the cache as well
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != getattr(self._local, "data_version", None):
+            self._cache.clear()
+            self._local.data_version = version
+
+    def get_user(self, username):
+        conn = self._connect()
+        self._validate_cache(conn)
+        user = self._cache.get(username)
+        if user is not None:
+            increment("user_cache.hits")
+            return user
+        increment("user_cache.misses")
+        row = conn.execute(
+            "SELECT username, password, role FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        user = dict(zip(COLUMNS, row))
+        self._cache[username] = user
+        return user
+
+    def add_user(self, username, password, role):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                    (username, password, role),
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def update_password(self, username, password):
+        with self._connect() as conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (password, username))
+        self._cache.pop(username, None)
+
+    def import_users(self, rows):
+        """
+        Bulk-insert (username, password, role) rows, skipping existing usernames.
+        Returns the number of rows inserted.
+        """
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)", rows
+            )
+            return conn.total_changes - before
+
+
+def migrate_csv_to_sqlite(csv_file=config.USER_FILE, db_file=config.USER_DB_FILE):
+    """
+    One-shot copy of the legacy users.csv into the SQLite store.
+    Safe to re-run: usernames already in the database are skipped.
+    """
+    store = SqliteUserStore(db_file)
+    with open(csv_file, newline="") as f:
+        rows = [(row["username"], row["password"], row["role"]) for row in csv.DictReader(f)]
+    return store.import_users(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """
+    Process-wide user store for the configured backend.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if config.USER_STORE_BACKEND == "csv":
+                _store = CsvUserStore(config.USER_FILE)
+            elif config.USER_STORE_BACKEND == "sqlite":
+                first_run = not os.path.exists(config.USER_DB_FILE)
+                _store = SqliteUserStore(config.USER_DB_FILE)
+                if first_run and os.path.exists(config.USER_FILE):
+                    migrate_csv_to_sqlite(config.USER_FILE, config.USER_DB_FILE)
+            else:
+                raise ValueError(f"Unknown user store backend '{config.USER_STORE_BACKEND}'. "
+                                 "Choose from ['sqlite', 'csv']")
+        return _store
+
+
+if __name__ == "__main__":
+    count = migrate_csv_to_sqlite()
+    print(f"✅ Migrated {count} users from {config.USER_FILE} to {config.USER_DB_FILE}")